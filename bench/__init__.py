@@ -0,0 +1 @@
+"""Offline benchmarks for the scrape-to-notify pipeline: python -m bench.run"""
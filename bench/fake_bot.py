@@ -0,0 +1,43 @@
+import itertools
+from types import SimpleNamespace
+
+
+class FakeBot:
+    """Records Bot API calls instead of sending them.
+
+    Covers the methods the bot uses; each returns a message-like object
+    with a message_id and, for photos, a file_id.
+    """
+
+    def __init__(self):
+        self.id = 1
+        self.calls: list[tuple[str, dict]] = []
+        self._ids = itertools.count(1)
+
+    def _message(self, photo: bool = False) -> SimpleNamespace:
+        message_id = next(self._ids)
+        sizes = [SimpleNamespace(file_id=f"file-{message_id}")] if photo else None
+        return SimpleNamespace(message_id=message_id, photo=sizes)
+
+    async def send_message(self, **kwargs):
+        self.calls.append(("send_message", kwargs))
+        return self._message()
+
+    async def send_photo(self, **kwargs):
+        self.calls.append(("send_photo", kwargs))
+        return self._message(photo=True)
+
+    async def edit_message_text(self, **kwargs):
+        self.calls.append(("edit_message_text", kwargs))
+        return True
+
+    async def edit_message_caption(self, **kwargs):
+        self.calls.append(("edit_message_caption", kwargs))
+        return True
+
+    async def edit_message_media(self, **kwargs):
+        self.calls.append(("edit_message_media", kwargs))
+        return True
+
+    def count(self, method: str) -> int:
+        return sum(1 for name, _ in self.calls if name == method)
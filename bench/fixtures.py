@@ -0,0 +1,126 @@
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from PIL import Image
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+PROMOTER = "Federação Portuguesa de Padel"
+
+WORDS = [
+    "Open", "Solverde", "Espinho", "Lisboa", "Porto", "Cascais", "Oeiras", "Sintra", "Algarve",
+    "Summer", "Winter", "Cup", "Masters", "Challenger", "Amigos", "Clube", "Grand", "Prix",
+    "Estoril", "Braga", "Coimbra", "Aveiro", "Faro", "Setúbal", "Indoor", "Social", "Mix",
+]
+
+
+def _name(i: int) -> str:
+    return f"{' '.join(random.Random(i).sample(WORDS, 3))} {i}"
+
+
+def padelteams_html(count: int, image_base: str = "", seed: int = 1) -> str:
+    """Organizer page with `count` future competition cards in padelteams.pt markup."""
+    rng = random.Random(seed)
+    today = date.today()
+    cards = []
+    for i in range(count):
+        start = today + timedelta(days=1 + i % 365)
+        end = start + timedelta(days=rng.randint(0, 2))
+        img = f'<img class="cover-image-mini" src="{image_base}/img/{i % 20}_t.jpeg">' if image_base else ""
+        cards.append(
+            f'<div class="col"><a href="/info/competition?k=Y2lkPT{i:06d}">'
+            f'<div class="card">{img}'
+            f'<div class="text-dark bold">{_name(i)}</div>'
+            f'<div class="small"><span class="px2 bold">{start:%d-%m-%Y}</span>'
+            f'<span class="px2 bold">{end:%d-%m-%Y}</span></div>'
+            f'<div class="muted">Inscrições abertas</div></div></a></div>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>Competições</title></head><body>"
+        '<nav><a href="/">Início</a><a href="/infoclub">Clube</a></nav>'
+        f'<div class="row">{"".join(cards)}</div></body></html>'
+    )
+
+
+def tiepadel_items(count: int, image_base: str = "", seed: int = 2, overlap: float = 0.1) -> list[dict]:
+    """tiepadel.com search results; `overlap` of them repeat padelteams events."""
+    rng = random.Random(seed)
+    today = date.today()
+    items = []
+    for i in range(count):
+        start = today + timedelta(days=1 + i % 365)
+        # Same name and start date as card i of padelteams_html, so these match across sources
+        name = _name(i).upper() if rng.random() < overlap else _name(100000 + i)
+        end = start + timedelta(days=rng.randint(0, 2))
+        items.append({
+            "CODTOU": 50000 + i,
+            "TITLE": name,
+            "DATES": f"{start:%Y-%m-%d} to {end:%Y-%m-%d}",
+            "CRITOU_NAMREC": PROMOTER if i % 10 else "Outro Promotor",
+            "LOC_NAMREC": f"Clube {i % 50}",
+            "LINK": f"/tournament/{50000 + i}",
+            "IMAGE": f"{image_base}/img/{i % 20}.jpeg" if image_base else "",
+        })
+    return items
+
+
+def cover_image(index: int, size: int = 1600) -> bytes:
+    """A flat-colour JPEG cover, large enough to be downscaled on normalization."""
+    out = io.BytesIO()
+    Image.new("RGB", (size, size * 9 // 16), ((index * 37) % 256, (index * 91) % 256, 120)).save(out, "JPEG")
+    return out.getvalue()
+
+
+def load_recorded() -> tuple[str | None, list[dict] | None]:
+    """Pages saved by `python -m bench.fixtures --record`, if any."""
+    html = items = None
+    path = os.path.join(FIXTURES_DIR, "padelteams.html")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+    path = os.path.join(FIXTURES_DIR, "tiepadel.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+    return html, items
+
+
+async def record():
+    """Save the live pages of the configured sources for offline replay."""
+    from database import init_db, close_db
+    from http_client import close_session, get_session
+    from parser import _fetch_tiepadel_pages
+    from sources import load_sources
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    tmp = tempfile.TemporaryDirectory()
+    await init_db(os.path.join(tmp.name, "record.db"))
+    try:
+        for source in load_sources():
+            if source.type == "padelteams":
+                async with get_session().get(source.options["url"]) as resp:
+                    resp.raise_for_status()
+                    html = await resp.text()
+                with open(os.path.join(FIXTURES_DIR, "padelteams.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+                print(f"{source.name}: {len(html)} bytes")
+            elif source.type == "tiepadel":
+                items = [item for data, _ in await _fetch_tiepadel_pages(source) for item in data]
+                with open(os.path.join(FIXTURES_DIR, "tiepadel.json"), "w", encoding="utf-8") as f:
+                    json.dump(items, f, ensure_ascii=False)
+                print(f"{source.name}: {len(items)} items")
+    finally:
+        await close_session()
+        await close_db()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["--record"]:
+        sys.exit("usage: python -m bench.fixtures --record")
+    asyncio.run(record())
@@ -0,0 +1,54 @@
+"""Parity check of the two padelteams extractors.
+
+    python -m bench.parity [page.html ...]
+
+Runs the soup and fast backends on every saved page in bench/fixtures,
+on any pages given as arguments and on a synthetic page, and exits
+non-zero if they disagree.
+"""
+import glob
+import os
+import sys
+
+from bench.fixtures import FIXTURES_DIR, padelteams_html
+from parser import parse_tournaments_html_fast, parse_tournaments_html_soup
+
+
+def compare_backends(html: str) -> list[str]:
+    """Run both padelteams extractors on a page and describe any differences."""
+    reference = parse_tournaments_html_soup(html)
+    fast = parse_tournaments_html_fast(html)
+    problems = []
+    if len(reference) != len(fast):
+        problems.append(f"count differs: soup={len(reference)} fast={len(fast)}")
+    for expected, actual in zip(reference, fast):
+        if expected != actual:
+            problems.append(f"soup={expected!r}\n  fast={actual!r}")
+    return problems
+
+
+def pages(extra: list[str]) -> list[tuple[str, str]]:
+    found = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))) + extra:
+        with open(path, "r", encoding="utf-8") as f:
+            found.append((os.path.relpath(path), f.read()))
+    found.append(("synthetic (50 cards)", padelteams_html(50, "https://padelteams.pt")))
+    return found
+
+
+def main(extra: list[str]) -> int:
+    failed = False
+    for label, html in pages(extra):
+        problems = compare_backends(html)
+        # A page without future tournaments would pass without checking anything
+        if not parse_tournaments_html_soup(html):
+            problems.append("no tournaments extracted")
+        print(f"{label}: {'OK' if not problems else 'MISMATCH'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,172 @@
+"""Replay benchmark of the scrape-to-notify pipeline against local fixtures.
+
+    python -m bench.run [--scales 10 100 1000 10000] [--replay]
+
+Everything runs offline: sources point at a local stub server, Telegram
+is a FakeBot, and the database and image cache live in a temp directory.
+Telegram rate limits are lifted, so the numbers show the bot's own cost.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+import database
+import images
+import parser
+import sender
+from checker import check_source
+from http_client import close_session
+from metrics import DB_SECONDS
+from poster import format_post, publish_to_group
+from sources import load_sources
+from config import TIEPADEL_PAGE_SIZE
+
+from bench.fake_bot import FakeBot
+from bench.fixtures import padelteams_html, tiepadel_items, load_recorded
+from bench.stub_server import StubServer
+
+VENUE = {"name": "Bench Padel Club", "url": "https://example.com/venue"}
+PUBLISH_SAMPLE = 50
+
+
+class DbOps:
+    """Counts database.py calls, as recorded per operation in DB_SECONDS.
+
+    One call is one batched statement or transaction, however many rows,
+    trigger and FTS statements SQLite runs for it.
+    """
+
+    def __init__(self):
+        self.seen = self._total()
+
+    @staticmethod
+    def _total() -> int:
+        return sum(series["count"] for series in DB_SECONDS.values.values())
+
+    def take(self) -> int:
+        total = self._total()
+        count, self.seen = total - self.seen, total
+        return count
+
+
+def _timed(func, *args, repeat: int = 3) -> float:
+    """Best wall time of a few calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _lift_rate_limits():
+    sender.SEND_RATE_PRIVATE = sender.SEND_RATE_GROUP = 1e9
+    sender.outbox._global = sender.TokenBucket(1e9, 1e9)
+
+
+async def _drain_background():
+    while images._background:
+        await asyncio.gather(*images._background, return_exceptions=True)
+
+
+async def bench_scale(label: str, html: str, items: list[dict]) -> list[str]:
+    """Run parse, scrape, rescrape and publish at one fixture size; returns report lines."""
+    tmp = tempfile.TemporaryDirectory()
+    images.IMAGE_CACHE_DIR = os.path.join(tmp.name, "images")
+    stub = StubServer(html, items, TIEPADEL_PAGE_SIZE)
+    await stub.start()
+    # Synthetic fixtures refer to the stub for covers; recorded ones keep their URLs
+    stub.html = html.replace("{stub}", stub.base_url)
+    stub.items = [{**item, "IMAGE": item["IMAGE"].replace("{stub}", stub.base_url)} for item in items]
+    parser.TIEPADEL_URL = stub.tiepadel_url
+    await database.init_db(os.path.join(tmp.name, "bench.db"))
+    ops = DbOps()
+    bot = FakeBot()
+    lines = [f"== {label} =="]
+    try:
+        soup = _timed(parser.parse_tournaments_html_soup, stub.html)
+        fast = _timed(parser.parse_tournaments_html_fast, stub.html)
+        pages = [stub.items[i:i + TIEPADEL_PAGE_SIZE] for i in range(0, len(stub.items), TIEPADEL_PAGE_SIZE)]
+        tie = statistics.mean(
+            _timed(parser.parse_tiepadel_items, page, date.today()) for page in pages[:100]
+        ) if pages else 0.0
+        lines.append(
+            f"parse  padelteams page: soup {soup * 1000:.1f} ms, fast {fast * 1000:.1f} ms"
+            f" | tiepadel page ({TIEPADEL_PAGE_SIZE} items): {tie * 1000:.2f} ms"
+        )
+
+        sources = load_sources([
+            {"name": "padelteams", "type": "padelteams", "url": stub.organizer_url, "timeout": 3600},
+            {"name": "tiepadel", "type": "tiepadel", "timeout": 3600, "concurrency": 4},
+        ])
+        for phase in ("scrape", "rescrape"):
+            for source in sources:
+                ops.take()
+                sent = len(bot.calls)
+                summary = await check_source(bot, source)
+                db_ops = ops.take()
+                found = summary["new"] + summary["changed"]
+                per_item = summary["seconds"] / found * 1000 if found else 0.0
+                lines.append(
+                    f"{phase:<8} {source.name:<10} {summary['seconds'] * 1000:8.1f} ms,"
+                    f" {summary['new']:5} new, {len(bot.calls) - sent:5} notifications,"
+                    f" {db_ops:6} DB ops, {per_item:.2f} ms per tournament"
+                )
+            await _drain_background()
+
+        rows, total = await database.get_pending_tournaments(PUBLISH_SAMPLE)
+        tournaments = await database.get_tournaments_by_ids([t.id for t in rows])
+        started = time.perf_counter()
+        for t in tournaments:
+            format_post(t, VENUE, "")
+        formatted = (time.perf_counter() - started) / max(len(tournaments), 1)
+        latencies = []
+        ops.take()
+        for t in tournaments:
+            started = time.perf_counter()
+            await publish_to_group(bot, t, VENUE, "")
+            latencies.append(time.perf_counter() - started)
+        if latencies:
+            lines.append(
+                f"publish  {len(latencies)} of {total} pending: median {statistics.median(latencies) * 1000:.2f} ms,"
+                f" max {max(latencies) * 1000:.2f} ms, {ops.take() / len(latencies):.1f} DB ops each,"
+                f" format_post {formatted * 1e6:.0f} µs"
+            )
+        lines.append(f"stub served {stub.requests} requests, bot received {len(bot.calls)} calls")
+    finally:
+        await sender.outbox.close()
+        await close_session()
+        await database.close_db()
+        await stub.stop()
+        tmp.cleanup()
+    return lines
+
+
+async def main(scales: list[int], replay: bool):
+    _lift_rate_limits()
+    runs = []
+    if replay:
+        html, items = load_recorded()
+        if html is None and items is None:
+            raise SystemExit("No recorded fixtures, run: python -m bench.fixtures --record")
+        runs.append(("recorded fixtures", html or "", items or []))
+    for n in scales:
+        runs.append((f"{n} tournaments per source", padelteams_html(n, "{stub}"), tiepadel_items(n, "{stub}")))
+    for label, html, items in runs:
+        for line in await bench_scale(label, html, items):
+            print(line)
+        print()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args.add_argument("--replay", action="store_true", help="also run the pages saved by bench.fixtures --record")
+    options = args.parse_args()
+    asyncio.run(main(options.scales, options.replay))
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import re
+
+from aiohttp import web
+
+from bench.fixtures import cover_image
+
+COUNT_ITEMS_RE = re.compile(r"count_items:\s*(\d+)")
+
+
+class StubServer:
+    """Local stand-in for padelteams.pt, tiepadel.com and the cover images.
+
+    Serves one organizer page and the tiepadel search method with the
+    same paging and ETag behaviour the fetchers rely on.
+    """
+
+    def __init__(self, html: str, items: list[dict], page_size: int):
+        self.html = html
+        self.items = items
+        self.page_size = page_size
+        self.requests = 0
+        self._images: dict[str, bytes] = {}
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    @property
+    def organizer_url(self) -> str:
+        return f"{self.base_url}/infoclub/competitions?k=YmlkPTgy"
+
+    @property
+    def tiepadel_url(self) -> str:
+        return f"{self.base_url}/methods.aspx/Get_Find_Tournaments"
+
+    def _respond(self, request: web.Request, body: str, content_type: str) -> web.Response:
+        self.requests += 1
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type=content_type, headers={"ETag": etag})
+
+    async def _organizer(self, request: web.Request) -> web.Response:
+        return self._respond(request, self.html, "text/html")
+
+    async def _tiepadel(self, request: web.Request) -> web.Response:
+        match = COUNT_ITEMS_RE.search(await request.text())
+        offset = int(match.group(1)) if match else 0
+        page = self.items[offset:offset + self.page_size]
+        return self._respond(request, json.dumps({"d": page}), "application/json")
+
+    async def _image(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        name = request.match_info["name"]
+        if name not in self._images:
+            self._images[name] = cover_image(int(name.split(".")[0].split("_")[0]))
+        return web.Response(body=self._images[name], content_type="image/jpeg")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/infoclub/competitions", self._organizer)
+        app.router.add_post("/methods.aspx/Get_Find_Tournaments", self._tiepadel)
+        app.router.add_get("/img/{name}", self._image)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -1,14 +1,26 @@
 import asyncio
 import logging
+import secrets
+import signal
+from datetime import datetime, date, timedelta
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from config import BOT_TOKEN, CHECK_INTERVAL_MINUTES
-from database import init_db, is_tournament_known, add_tournament
-from parser import fetch_tournaments, fetch_tiepadel_tournaments
-from handlers import router, notify_admin_new_tournament
+from config import (
+    BOT_TOKEN, SCHEDULE_JITTER_SECONDS, METRICS_HOST, METRICS_PORT, ARCHIVE_AFTER_DAYS, ARCHIVE_HOUR,
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT,
+)
+from database import init_db, close_db, archive_finished_tournaments, incremental_vacuum
+from checker import scheduled_check, check_now
+from sources import load_sources
+from http_client import close_session
+from handlers import router
+from metrics import start_metrics_server
+from sender import outbox
+from storage import fsm_storage
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,36 +29,39 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def check_new_tournaments(bot: Bot):
-    """Periodic task: fetch tournaments and notify admin about new ones."""
-    logger.info("Checking for new tournaments...")
-    tournaments = []
-    try:
-        tournaments.extend(fetch_tournaments())
-    except Exception:
-        logger.exception("Failed to fetch padelteams.pt tournaments")
+async def archive_past_tournaments():
+    """Move finished tournaments out of the hot table and shrink the file."""
+    before = (date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+    archived = await archive_finished_tournaments(before)
+    if archived:
+        await incremental_vacuum()
+        logger.info(f"Archived {archived} tournaments that ended before {before}")
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """Serve Telegram updates on a local aiohttp app until SIGTERM/SIGINT.
+
+    The reverse proxy forwards WEBHOOK_URL + WEBHOOK_PATH here; requests
+    without the secret token header are rejected by the handler.
+    """
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=dp["webhook_secret"]).register(app, path=WEBHOOK_PATH)
+    # Runs the dispatcher's startup/shutdown hooks with the app
+    setup_application(app, dp, bot=bot)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
     try:
-        tournaments.extend(fetch_tiepadel_tournaments())
-    except Exception:
-        logger.exception("Failed to fetch tiepadel.com tournaments")
-
-    for t in tournaments:
-        known = await is_tournament_known(t["key"])
-        if not known:
-            logger.info(f"New tournament found: {t['name']}")
-            await add_tournament(
-                cid=t["key"],
-                name=t["name"],
-                dates=t["dates"],
-                image_url=t["image_url"],
-                tournament_url=t["tournament_url"],
-                source=t.get("source", "padelteams"),
-                location=t.get("location", ""),
-            )
-            try:
-                await notify_admin_new_tournament(bot, t)
-            except Exception:
-                logger.exception(f"Failed to notify admin about {t['name']}")
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+        logger.info(f"Bot started. Webhook server on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+        await stop.wait()
+    finally:
+        await runner.cleanup()
 
 
 async def main():
@@ -54,27 +69,77 @@ async def main():
         logger.error("BOT_TOKEN is not set. Create .env file from .env.example")
         return
 
-    await init_db()
-
     bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.include_router(router)
-
+    sources = load_sources()
     scheduler = AsyncIOScheduler()
+    for source in sources:
+        # The first run happens right away through the scheduler itself, so it
+        # cannot overlap an interval tick; later runs are jittered
+        scheduler.add_job(
+            scheduled_check,
+            "interval",
+            minutes=source.interval_minutes,
+            jitter=SCHEDULE_JITTER_SECONDS,
+            args=[bot, source],
+            id=f"source:{source.name}",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=source.interval_minutes * 30,
+            next_run_time=datetime.now(),
+        )
+        logger.info(f"Scheduled {source.name} every {source.interval_minutes} min")
     scheduler.add_job(
-        check_new_tournaments,
-        "interval",
-        minutes=CHECK_INTERVAL_MINUTES,
-        args=[bot],
+        archive_past_tournaments,
+        "cron",
+        hour=ARCHIVE_HOUR,
+        id="archive",
+        coalesce=True,
+        # The first run is due before init_db() and webhook setup finish, so allow an hour's delay
+        misfire_grace_time=3600,
+        next_run_time=datetime.now(),
     )
-    scheduler.start()
-    logger.info(f"Scheduler started (every {CHECK_INTERVAL_MINUTES} min)")
 
-    # Run initial check on startup
-    await check_new_tournaments(bot)
+    await init_db()
+    await fsm_storage.purge_expired()
+    dp = Dispatcher(storage=fsm_storage)
+    # Injected into handlers: /check runs every source right away
+    dp["run_checks"] = lambda: check_now(bot, sources)
+    # Without a configured secret a fresh one is registered with Telegram on every start
+    dp["webhook_secret"] = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    dp.include_router(router)
+    metrics_runner = None
+
+    @dp.startup()
+    async def on_startup(bot: Bot):
+        nonlocal metrics_runner
+        if WEBHOOK_URL:
+            await bot.set_webhook(
+                WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+                secret_token=dp["webhook_secret"],
+                allowed_updates=dp.resolve_used_update_types(),
+            )
+        else:
+            # A webhook left over from an earlier run would make getUpdates fail
+            await bot.delete_webhook()
+        scheduler.start()
+        if METRICS_PORT:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+    @dp.shutdown()
+    async def on_shutdown(bot: Bot):
+        scheduler.shutdown(wait=False)
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await outbox.close()
+        await close_session()
+        await close_db()
+        await bot.session.close()
 
-    logger.info("Bot started. Polling...")
-    await dp.start_polling(bot)
+    if WEBHOOK_URL:
+        await run_webhook(dp, bot)
+    else:
+        logger.info("Bot started. Polling...")
+        await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
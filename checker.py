@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from dataclasses import replace
+
+from aiogram import Bot
+
+from config import NOTIFY_MODE, EDIT_PUBLISHED_ON_CHANGE
+from database import (
+    get_fingerprints, add_tournaments, update_tournaments, tournament_fingerprint, get_match_candidates,
+)
+from handlers import notify_admin_new_tournament, notify_admin_digest, notify_admin_tournament_changed
+from http_client import log_cache_stats, pending_cache, save_pending_cache
+from images import prefetch_images
+from matching import block_key, find_duplicates
+from metrics import CHECKS, CHECK_SECONDS, TOURNAMENTS_FOUND
+from models import Tournament
+from poster import update_published_posts
+from sources import Source, run_source
+
+logger = logging.getLogger(__name__)
+
+# Running check per source name; later triggers attach to it instead of starting another
+_in_flight: dict[str, asyncio.Task] = {}
+# Serializes the diff-and-store step so concurrent checks never notify twice
+_process_lock = asyncio.Lock()
+
+
+async def process_changed_tournament(bot: Bot, old: Tournament, new: Tournament):
+    """Optionally refresh published posts, then tell the admin what changed."""
+    edited = 0
+    if EDIT_PUBLISHED_ON_CHANGE and old.status == "published":
+        current = replace(new, id=old.id, status=old.status, canonical_cid=old.canonical_cid)
+        edited = await update_published_posts(bot, current, old.image_url != new.image_url)
+    try:
+        await notify_admin_tournament_changed(bot, old, new, edited)
+    except Exception:
+        logger.exception(f"Failed to notify admin about changes to {new.name}")
+
+
+async def process_tournaments(bot: Bot, tournaments: list[Tournament]) -> tuple[int, int]:
+    """Store scraped tournaments and notify admin about new and changed ones.
+
+    Returns the number of new and changed tournaments.
+    """
+    async with _process_lock:
+        by_key = {t.cid: t for t in tournaments}
+        fingerprints = await get_fingerprints(list(by_key))
+        new_tournaments = [t for key, t in by_key.items() if key not in fingerprints]
+        changed_tournaments = [
+            t for key, t in by_key.items()
+            if key in fingerprints and fingerprints[key] != tournament_fingerprint(t)
+        ]
+        # The same event listed on another source is stored, linked, and not announced again
+        keys = list({key for key in map(block_key, new_tournaments) if key})
+        links = find_duplicates(new_tournaments, await get_match_candidates(keys))
+        new_tournaments = [
+            replace(t, canonical_cid=links[t.cid]) if t.cid in links else t for t in new_tournaments
+        ]
+        await add_tournaments(new_tournaments)
+        previous = await update_tournaments(changed_tournaments)
+    duplicates = [t for t in new_tournaments if t.canonical_cid]
+    new_tournaments = [t for t in new_tournaments if not t.canonical_cid]
+    prefetch_images([t.image_url for t in new_tournaments + changed_tournaments])
+
+    for t in duplicates:
+        logger.info(f"Duplicate of {t.canonical_cid} found: {t.name} ({t.tournament_url})")
+
+    for t in changed_tournaments:
+        logger.info(f"Tournament changed: {t.name}")
+        if previous[t.cid].status == "duplicate":
+            continue
+        await process_changed_tournament(bot, previous[t.cid], t)
+
+    for t in new_tournaments:
+        logger.info(f"New tournament found: {t.name}")
+
+    if NOTIFY_MODE == "digest":
+        if new_tournaments:
+            try:
+                await notify_admin_digest(bot)
+            except Exception:
+                logger.exception("Failed to send digest to admin")
+        return len(new_tournaments), len(changed_tournaments)
+
+    # The send queue paces these to the admin chat's rate limit
+    results = await asyncio.gather(
+        *(notify_admin_new_tournament(bot, t) for t in new_tournaments),
+        return_exceptions=True,
+    )
+    for t, result in zip(new_tournaments, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Failed to notify admin about {t.name}", exc_info=result)
+    return len(new_tournaments), len(changed_tournaments)
+
+
+async def check_source(bot: Bot, source: Source) -> dict:
+    """Fetch one source and process its tournaments; returns a run summary."""
+    logger.info(f"Checking {source.name} for new tournaments...")
+    started = time.monotonic()
+    new = changed = 0
+    token = pending_cache.set([])
+    try:
+        tournaments = await run_source(source)
+        log_cache_stats(source.name)
+        if tournaments is not None:
+            new, changed = await process_tournaments(bot, tournaments)
+            # Pages count as seen only once their tournaments are stored
+            await save_pending_cache()
+            TOURNAMENTS_FOUND.inc(new, source=source.name, kind="new")
+            TOURNAMENTS_FOUND.inc(changed, source=source.name, kind="changed")
+    finally:
+        pending_cache.reset(token)
+    seconds = time.monotonic() - started
+    CHECKS.inc(source=source.name, result="ok" if tournaments is not None else "failed")
+    CHECK_SECONDS.observe(seconds, source=source.name)
+    return {
+        "source": source.name,
+        "ok": tournaments is not None,
+        "new": new,
+        "changed": changed,
+        "seconds": seconds,
+    }
+
+
+def trigger_check(bot: Bot, source: Source) -> tuple[asyncio.Task, bool]:
+    """Start a check of the source, or return the one already running.
+
+    The flag tells whether an existing run was joined.
+    """
+    task = _in_flight.get(source.name)
+    if task is not None and not task.done():
+        return task, True
+    task = asyncio.create_task(check_source(bot, source))
+    _in_flight[source.name] = task
+    task.add_done_callback(lambda t: _in_flight.pop(source.name, None) if _in_flight.get(source.name) is t else None)
+    return task, False
+
+
+async def scheduled_check(bot: Bot, source: Source):
+    """Scheduler entry point: at most one check per source runs at a time."""
+    task, attached = trigger_check(bot, source)
+    if attached:
+        logger.info(f"{source.name}: check already running, skipping scheduled run")
+        return
+    await asyncio.shield(task)
+
+
+async def check_now(bot: Bot, sources: list[Source]) -> list[tuple[dict, bool]]:
+    """Run all sources immediately (joining running checks); returns (summary, joined) pairs."""
+    triggered = [trigger_check(bot, source) for source in sources]
+    summaries = await asyncio.gather(*(asyncio.shield(task) for task, _ in triggered))
+    return [(summary, joined) for summary, (_, joined) in zip(summaries, triggered)]
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -7,9 +8,94 @@ BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 ADMIN_ID = int(os.getenv("ADMIN_ID", "0"))
 GROUP_CHAT_ID = int(os.getenv("GROUP_CHAT_ID", "0"))
 TOPIC_ID = int(os.getenv("TOPIC_ID", "0"))
+# Publishing destinations as JSON: [{"chat_id": -100..., "topic_id": 12, "match": {"source": "tiepadel"}}, ...]
+# "match" maps tournament fields to a value or list of values; routes without it get every tournament.
+PUBLISH_ROUTES = json.loads(os.getenv("PUBLISH_ROUTES", "") or "null") or [
+    {"chat_id": GROUP_CHAT_ID, "topic_id": TOPIC_ID},
+]
 
 PARSER_URL = "https://padelteams.pt/infoclub/competitions?k=YmlkPTgy"
 BASE_URL = "https://padelteams.pt"
 CHECK_INTERVAL_MINUTES = 60
 DB_PATH = "tournaments.db"
 VENUES_FILE = "venues.txt"
+# Scrape targets, each checked by its own job. Common keys: name, type,
+# interval_minutes, timeout (seconds for a whole check), concurrency
+# (parallel requests). Other keys are type-specific options.
+SOURCES = [
+    {
+        "name": "padelteams",
+        "type": "padelteams",
+        "url": PARSER_URL,
+        "interval_minutes": CHECK_INTERVAL_MINUTES,
+        "timeout": 60,
+    },
+    {
+        "name": "tiepadel_lisboa",
+        "type": "tiepadel",
+        "interval_minutes": CHECK_INTERVAL_MINUTES,
+        "timeout": 120,
+        "concurrency": 4,
+        "country": 196,
+        "region": 11,
+        "promoter": "Federação Portuguesa de Padel",
+        "exclude_words": ["liga"],
+    },
+]
+# Optional JSON file with the same structure, replacing the list above
+SOURCES_FILE = os.getenv("SOURCES_FILE", "")
+if SOURCES_FILE:
+    with open(SOURCES_FILE, "r", encoding="utf-8") as f:
+        SOURCES = json.load(f)
+HTTP_TIMEOUT = 30
+HTTP_POOL_SIZE = 10
+TIEPADEL_PAGE_SIZE = 10
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "soup")  # "soup" or "fast"
+IMAGE_CACHE_DIR = "image_cache"
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+IMAGE_PREFETCH_CONCURRENCY = 4
+# Covers are downscaled and re-encoded once before upload; Telegram shows photos at up to 1280px
+IMAGE_NORMALIZE = os.getenv("IMAGE_NORMALIZE", "1") == "1"
+IMAGE_MAX_SIDE = 1280
+IMAGE_FORMAT = "JPEG"  # "JPEG" or "WEBP"
+IMAGE_QUALITY = 85
+FSM_STATE_TTL = 24 * 60 * 60
+# "each": one notification per new tournament; "digest": one paginated summary per check
+NOTIFY_MODE = os.getenv("NOTIFY_MODE", "each")
+DIGEST_PAGE_SIZE = 8
+# Names listed when a batch is confirmed; the rest are only counted, keeping the message under Telegram's limit
+BATCH_LIST_SIZE = 30
+# Results per page of /find, /upcoming and /pending; /upcoming looks this many days ahead by default, up to the max
+SEARCH_PAGE_SIZE = 8
+UPCOMING_DAYS = 30
+UPCOMING_MAX_DAYS = 3650
+# Telegram limits: ~1 msg/s per private chat, 20 msg/min per group, 30 msg/s overall
+SEND_RATE_PRIVATE = 1.0
+SEND_RATE_GROUP = 20 / 60
+SEND_RATE_GLOBAL = 30.0
+SEND_MAX_RETRIES = 5
+# Edit already published group posts when a tournament changes on the source
+EDIT_PUBLISHED_ON_CHANGE = os.getenv("EDIT_PUBLISHED_ON_CHANGE", "0") == "1"
+# Failing sources: retries per check, then a circuit breaker with exponential backoff
+RETRY_BUDGET = 3
+RETRY_BASE_SECONDS = 1
+BREAKER_FAILURE_THRESHOLD = 3
+BACKOFF_BASE_SECONDS = 5 * 60
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+# Scheduled checks are spread by up to this many seconds so sources don't fire together
+SCHEDULE_JITTER_SECONDS = 120
+# Same-day tournaments from different sources with names at least this similar are one event
+MATCH_SIMILARITY = 0.8
+# Tournaments that ended more than ARCHIVE_AFTER_DAYS ago move to tournaments_archive, daily at ARCHIVE_HOUR
+ARCHIVE_AFTER_DAYS = 7
+ARCHIVE_HOUR = 4
+# Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics; port 0 turns the endpoint off
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+# Webhook mode: Telegram posts updates to WEBHOOK_URL + WEBHOOK_PATH, which the reverse
+# proxy forwards to WEBHOOK_HOST:WEBHOOK_PORT. Without WEBHOOK_URL the bot uses long polling.
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = "127.0.0.1"
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
@@ -1,9 +1,107 @@
+import asyncio
+import hashlib
+import re
+from contextlib import asynccontextmanager
+from datetime import date
+
 import aiosqlite
 from config import DB_PATH
+from matching import block_key
+from metrics import DB_SECONDS, timed
+from models import Tournament, TOURNAMENT_COLUMNS, parse_dates
+
+# Stay well below SQLite's host parameter limit in IN (...) queries
+QUERY_CHUNK_SIZE = 500
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Scraped fields that make up a tournament's fingerprint
+FINGERPRINT_FIELDS = ("name", "dates", "image_url", "tournament_url", "location")
+
+# Columns copied to tournaments_archive when a finished tournament is archived
+ARCHIVE_COLUMNS = (
+    "id", "cid", "name", "dates", "image_url", "tournament_url", "source", "location", "status",
+    "created_at", "fingerprint", "block_key", "canonical_cid", "start_date", "end_date",
+)
+
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+# One connection for writes and one for reads: in WAL mode readers never
+# wait for the scraper's write transactions.
+_writer: aiosqlite.Connection | None = None
+_reader: aiosqlite.Connection | None = None
+_write_lock = asyncio.Lock()
+
+
+async def _open(path: str) -> aiosqlite.Connection:
+    db = await aiosqlite.connect(path, cached_statements=256)
+    db.row_factory = aiosqlite.Row
+    for pragma in PRAGMAS:
+        await db.execute(pragma)
+    return db
+
+
+def _read_db() -> aiosqlite.Connection:
+    if _reader is None:
+        raise RuntimeError("Database is not initialized, call init_db() first")
+    return _reader
+
+
+@asynccontextmanager
+async def _write_db():
+    """Serialize write transactions on the writer connection."""
+    if _writer is None:
+        raise RuntimeError("Database is not initialized, call init_db() first")
+    async with _write_lock:
+        try:
+            yield _writer
+            await _writer.commit()
+        except BaseException:
+            await _writer.rollback()
+            raise
+
 
+def _iso(d: date | None) -> str | None:
+    return d.isoformat() if d else None
 
-async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
+
+def _fingerprint(values) -> str:
+    return hashlib.sha1("\x1f".join(value or "" for value in values).encode()).hexdigest()
+
+
+def tournament_fingerprint(t: Tournament) -> str:
+    """Hash of the scraped fields, used to detect changed tournaments."""
+    return _fingerprint(getattr(t, field) for field in FINGERPRINT_FIELDS)
+
+
+async def _add_missing_columns(db: aiosqlite.Connection, table: str, columns: dict[str, str]) -> list[str]:
+    """ALTER TABLE for columns added after the table was first created."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in await cursor.fetchall()}
+    added = []
+    for name, decl in columns.items():
+        if name not in existing:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            added.append(name)
+    return added
+
+
+async def init_db(path: str = DB_PATH):
+    global _writer, _reader
+    _writer = await _open(path)
+    cursor = await _writer.execute("PRAGMA auto_vacuum")
+    if (await cursor.fetchone())[0] != 2:
+        # Switching an existing database to incremental auto-vacuum takes one full VACUUM
+        await _writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await _writer.execute("VACUUM")
+    async with _write_db() as db:
         await db.execute("""
             CREATE TABLE IF NOT EXISTS tournaments (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -18,42 +116,466 @@ async def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        await db.commit()
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                cache_key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                body TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS telegram_files (
+                image_key TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS fsm_storage (
+                key TEXT PRIMARY KEY,
+                state TEXT,
+                data TEXT NOT NULL DEFAULT '{}',
+                updated_at REAL NOT NULL
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS publications (
+                cid TEXT NOT NULL,
+                chat_id INTEGER NOT NULL,
+                topic_id INTEGER NOT NULL DEFAULT 0,
+                message_id INTEGER,
+                kind TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (cid, chat_id, topic_id)
+            )
+        """)
+        await _add_missing_columns(db, "publications", {
+            "venue_name": "TEXT",
+            "venue_url": "TEXT",
+            "description": "TEXT",
+        })
+        if await _add_missing_columns(db, "tournaments", {"fingerprint": "TEXT"}):
+            cursor = await db.execute(
+                f"SELECT cid, {', '.join(FINGERPRINT_FIELDS)} FROM tournaments"
+            )
+            await db.executemany(
+                "UPDATE tournaments SET fingerprint = ? WHERE cid = ?",
+                [(_fingerprint(row[field] for field in FINGERPRINT_FIELDS), row["cid"]) for row in await cursor.fetchall()],
+            )
+        if await _add_missing_columns(db, "tournaments", {"block_key": "TEXT", "canonical_cid": "TEXT"}):
+            cursor = await db.execute("SELECT cid, dates FROM tournaments")
+            await db.executemany(
+                "UPDATE tournaments SET block_key = ? WHERE cid = ?",
+                [(_iso(parse_dates(row["dates"])[0]), row["cid"]) for row in await cursor.fetchall()],
+            )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_tournaments_block_key ON tournaments (block_key)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_tournaments_canonical ON tournaments (canonical_cid)")
+        if await _add_missing_columns(db, "tournaments", {"start_date": "DATE", "end_date": "DATE"}):
+            cursor = await db.execute("SELECT cid, dates FROM tournaments")
+            await db.executemany(
+                "UPDATE tournaments SET start_date = ?, end_date = ? WHERE cid = ?",
+                [(*map(_iso, parse_dates(row["dates"])), row["cid"]) for row in await cursor.fetchall()],
+            )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_tournaments_status_start ON tournaments (status, start_date)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_tournaments_end ON tournaments (end_date)")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS tournaments_archive (
+                id INTEGER PRIMARY KEY,
+                cid TEXT NOT NULL,
+                name TEXT NOT NULL,
+                dates TEXT NOT NULL,
+                image_url TEXT,
+                tournament_url TEXT,
+                source TEXT,
+                location TEXT,
+                status TEXT,
+                created_at TIMESTAMP,
+                fingerprint TEXT,
+                block_key TEXT,
+                canonical_cid TEXT,
+                start_date DATE,
+                end_date DATE,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Standalone FTS index keyed by tournament id; archiving does not remove
+        # rows from it, so past tournaments stay searchable
+        cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE name = 'tournament_search'")
+        if await cursor.fetchone() is None:
+            await db.execute("""
+                CREATE VIRTUAL TABLE tournament_search USING fts5(
+                    name, location, tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            for table in ("tournaments", "tournaments_archive"):
+                await db.execute(
+                    f"INSERT INTO tournament_search (rowid, name, location) SELECT id, name, location FROM {table}"
+                )
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS tournaments_search_insert AFTER INSERT ON tournaments BEGIN
+                INSERT INTO tournament_search (rowid, name, location) VALUES (new.id, new.name, new.location);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS tournaments_search_update AFTER UPDATE OF name, location ON tournaments BEGIN
+                UPDATE tournament_search SET name = new.name, location = new.location WHERE rowid = new.id;
+            END
+        """)
+    _reader = await _open(path)
 
 
-async def is_tournament_known(cid: str) -> bool:
-    async with aiosqlite.connect(DB_PATH) as db:
+async def close_db():
+    """Close the shared connections on shutdown."""
+    global _writer, _reader
+    for db in (_reader, _writer):
+        if db is not None:
+            await db.close()
+    _writer = None
+    _reader = None
+
+
+@timed(DB_SECONDS)
+async def get_fingerprints(cids: list[str]) -> dict[str, str]:
+    """Map each already stored cid to its fingerprint; unknown cids are absent."""
+    db = _read_db()
+    fingerprints = {}
+    for i in range(0, len(cids), QUERY_CHUNK_SIZE):
+        chunk = cids[i:i + QUERY_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
         cursor = await db.execute(
-            "SELECT 1 FROM tournaments WHERE cid = ?", (cid,)
+            f"SELECT cid, fingerprint FROM tournaments WHERE cid IN ({placeholders})", chunk
         )
-        row = await cursor.fetchone()
-        return row is not None
+        fingerprints.update((row[0], row[1]) for row in await cursor.fetchall())
+    return fingerprints
 
 
-async def add_tournament(cid: str, name: str, dates: str, image_url: str, tournament_url: str, source: str = "padelteams", location: str = ""):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT OR IGNORE INTO tournaments (cid, name, dates, image_url, tournament_url, source, location) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (cid, name, dates, image_url, tournament_url, source, location),
+@timed(DB_SECONDS)
+async def add_tournaments(tournaments: list[Tournament]):
+    """Insert scraped tournaments in a single transaction.
+
+    Tournaments with a canonical_cid are stored as duplicates of that one.
+    """
+    if not tournaments:
+        return
+    async with _write_db() as db:
+        await db.executemany(
+            "INSERT OR IGNORE INTO tournaments (cid, name, dates, image_url, tournament_url, source, location, fingerprint, block_key, canonical_cid, status, start_date, end_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    t.cid, t.name, t.dates, t.image_url, t.tournament_url,
+                    t.source, t.location, tournament_fingerprint(t),
+                    block_key(t), t.canonical_cid,
+                    "duplicate" if t.canonical_cid else "pending",
+                    _iso(t.start), _iso(t.end),
+                )
+                for t in tournaments
+            ],
+        )
+
+
+@timed(DB_SECONDS)
+async def update_tournaments(tournaments: list[Tournament]) -> dict[str, Tournament]:
+    """Overwrite changed tournaments with scraped values; returns the previous records by cid."""
+    if not tournaments:
+        return {}
+    previous = {t.cid: t for t in await get_tournaments_by_cids([t.cid for t in tournaments])}
+    async with _write_db() as db:
+        await db.executemany(
+            "UPDATE tournaments SET name = ?, dates = ?, image_url = ?, tournament_url = ?, location = ?, fingerprint = ?, block_key = ?, start_date = ?, end_date = ? WHERE cid = ?",
+            [
+                (
+                    t.name, t.dates, t.image_url, t.tournament_url,
+                    t.location, tournament_fingerprint(t), block_key(t),
+                    _iso(t.start), _iso(t.end), t.cid,
+                )
+                for t in tournaments
+            ],
+        )
+    return previous
+
+
+@timed(DB_SECONDS)
+async def get_tournaments_by_cids(cids: list[str]) -> list[Tournament]:
+    db = _read_db()
+    tournaments = []
+    for i in range(0, len(cids), QUERY_CHUNK_SIZE):
+        chunk = cids[i:i + QUERY_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor = await db.execute(
+            f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE cid IN ({placeholders})", chunk
+        )
+        tournaments.extend(map(Tournament.from_row, await cursor.fetchall()))
+    return tournaments
+
+
+@timed(DB_SECONDS)
+async def get_match_candidates(block_keys: list[str]) -> list[dict]:
+    """Stored tournaments sharing a block key, for duplicate matching."""
+    db = _read_db()
+    rows = []
+    for i in range(0, len(block_keys), QUERY_CHUNK_SIZE):
+        chunk = block_keys[i:i + QUERY_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor = await db.execute(
+            f"SELECT cid, name, source, block_key, canonical_cid FROM tournaments WHERE block_key IN ({placeholders})",
+            chunk,
         )
-        await db.commit()
+        rows.extend(dict(row) for row in await cursor.fetchall())
+    return rows
+
+
+@timed(DB_SECONDS)
+async def get_linked_tournaments(cid: str) -> list[Tournament]:
+    """Duplicates from other sources linked to a canonical tournament."""
+    cursor = await _read_db().execute(
+        f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE canonical_cid = ? ORDER BY id", (cid,)
+    )
+    return [Tournament.from_row(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_SECONDS)
+async def get_tournament_by_cid(cid: str) -> Tournament | None:
+    cursor = await _read_db().execute(
+        f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE cid = ?", (cid,)
+    )
+    row = await cursor.fetchone()
+    if row:
+        return Tournament.from_row(row)
+    return None
+
 
+@timed(DB_SECONDS)
+async def get_pending_tournaments(limit: int, offset: int = 0) -> tuple[list[Tournament], int]:
+    """Return one page of pending tournaments and the total pending count."""
+    db = _read_db()
+    cursor = await db.execute(
+        f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE status = 'pending' ORDER BY start_date, id LIMIT ? OFFSET ?",
+        (limit, offset),
+    )
+    rows = [Tournament.from_row(row) for row in await cursor.fetchall()]
+    cursor = await db.execute("SELECT COUNT(*) FROM tournaments WHERE status = 'pending'")
+    total = (await cursor.fetchone())[0]
+    return rows, total
 
-async def get_tournament_by_cid(cid: str) -> dict | None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+
+@timed(DB_SECONDS)
+async def get_pending_ids() -> list[int]:
+    cursor = await _read_db().execute(
+        "SELECT id FROM tournaments WHERE status = 'pending' ORDER BY start_date, id"
+    )
+    return [row[0] for row in await cursor.fetchall()]
+
+
+@timed(DB_SECONDS)
+async def get_tournaments_by_ids(ids: list[int]) -> list[Tournament]:
+    """Fetch several tournaments at once, ordered by id."""
+    db = _read_db()
+    tournaments = []
+    for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+        chunk = ids[i:i + QUERY_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
         cursor = await db.execute(
-            "SELECT * FROM tournaments WHERE cid = ?", (cid,)
+            f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE id IN ({placeholders})", chunk
+        )
+        tournaments.extend(map(Tournament.from_row, await cursor.fetchall()))
+    tournaments.sort(key=lambda t: t.id)
+    return tournaments
+
+
+def _match_query(text: str) -> str:
+    """FTS5 query matching every word of the text as a prefix."""
+    return " ".join(f'"{word}"*' for word in SEARCH_TOKEN_RE.findall(text))
+
+
+@timed(DB_SECONDS)
+async def search_tournaments(text: str, limit: int, offset: int = 0) -> tuple[list[Tournament], int]:
+    """Full-text search over names and locations.
+
+    Live tournaments come first, soonest first; then archived ones, latest first.
+    """
+    query = _match_query(text)
+    if not query:
+        return [], 0
+    db = _read_db()
+    cursor = await db.execute(
+        f"""
+        SELECT * FROM (
+            SELECT {TOURNAMENT_COLUMNS}, 0 AS archived FROM tournaments
+            WHERE id IN (SELECT rowid FROM tournament_search WHERE tournament_search MATCH ?1)
+            UNION ALL
+            SELECT {TOURNAMENT_COLUMNS}, 1 AS archived FROM tournaments_archive
+            WHERE id IN (SELECT rowid FROM tournament_search WHERE tournament_search MATCH ?1)
         )
-        row = await cursor.fetchone()
-        if row:
-            return dict(row)
+        ORDER BY archived, CASE archived WHEN 0 THEN start_date END, start_date DESC
+        LIMIT ?2 OFFSET ?3
+        """,
+        (query, limit, offset),
+    )
+    rows = [Tournament.from_row(row) for row in await cursor.fetchall()]
+    cursor = await db.execute(
+        "SELECT COUNT(*) FROM tournament_search WHERE tournament_search MATCH ?", (query,)
+    )
+    total = (await cursor.fetchone())[0]
+    return rows, total
+
+
+@timed(DB_SECONDS)
+async def get_upcoming_tournaments(until: str, limit: int, offset: int = 0) -> tuple[list[Tournament], int]:
+    """Pending and published tournaments starting from today up to the given ISO date."""
+    db = _read_db()
+    today = date.today().isoformat()
+    where = "status IN ('pending', 'published') AND start_date BETWEEN ? AND ?"
+    cursor = await db.execute(
+        f"SELECT {TOURNAMENT_COLUMNS} FROM tournaments WHERE {where} ORDER BY start_date, id LIMIT ? OFFSET ?",
+        (today, until, limit, offset),
+    )
+    rows = [Tournament.from_row(row) for row in await cursor.fetchall()]
+    cursor = await db.execute(f"SELECT COUNT(*) FROM tournaments WHERE {where}", (today, until))
+    total = (await cursor.fetchone())[0]
+    return rows, total
+
+
+@timed(DB_SECONDS)
+async def archive_finished_tournaments(before: str) -> int:
+    """Move tournaments that ended before the given ISO date to tournaments_archive."""
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    async with _write_db() as db:
+        await db.execute(
+            f"INSERT OR REPLACE INTO tournaments_archive ({columns}) SELECT {columns} FROM tournaments WHERE end_date < ?",
+            (before,),
+        )
+        cursor = await db.execute("DELETE FROM tournaments WHERE end_date < ?", (before,))
+        return cursor.rowcount
+
+
+@timed(DB_SECONDS)
+async def incremental_vacuum(pages: int = 0):
+    """Return free pages to the filesystem; 0 frees all of them."""
+    async with _write_db() as db:
+        cursor = await db.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+        # The pragma frees one page per step, so it has to be run to completion
+        await cursor.fetchall()
+
+
+@timed(DB_SECONDS)
+async def get_delivered_destinations(cid: str) -> set[tuple[int, int]]:
+    """Return (chat_id, topic_id) pairs the tournament is already published to."""
+    cursor = await _read_db().execute(
+        "SELECT chat_id, topic_id FROM publications WHERE cid = ? AND status = 'published'", (cid,)
+    )
+    return {(row[0], row[1]) for row in await cursor.fetchall()}
+
+
+@timed(DB_SECONDS)
+async def get_published_posts(cid: str) -> list[dict]:
+    """Delivered posts of a tournament, with the venue and description they used."""
+    cursor = await _read_db().execute(
+        "SELECT * FROM publications WHERE cid = ? AND status = 'published' AND message_id IS NOT NULL", (cid,)
+    )
+    return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_SECONDS)
+async def record_publications(cid: str, results: list[dict], venue: dict, description: str):
+    """Store per-destination outcomes; the tournament counts as published once none failed."""
+    if not results:
+        return
+    async with _write_db() as db:
+        await db.executemany(
+            "INSERT OR REPLACE INTO publications (cid, chat_id, topic_id, message_id, kind, status, error, venue_name, venue_url, description, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            [
+                (
+                    cid, r["chat_id"], r["topic_id"], r["message_id"], r["kind"],
+                    "failed" if r["error"] else "published", r["error"],
+                    venue["name"], venue["url"], description,
+                )
+                for r in results
+            ],
+        )
+        if not any(r["error"] for r in results):
+            await db.execute(
+                "UPDATE tournaments SET status = 'published' WHERE cid = ?", (cid,)
+            )
+
+
+@timed(DB_SECONDS)
+async def get_http_cache(cache_key: str) -> dict | None:
+    cursor = await _read_db().execute(
+        "SELECT * FROM http_cache WHERE cache_key = ?", (cache_key,)
+    )
+    row = await cursor.fetchone()
+    if row:
+        return dict(row)
+    return None
+
+
+@timed(DB_SECONDS)
+async def save_http_cache(rows: list[tuple]):
+    """Store (cache_key, etag, last_modified, content_hash, body) rows."""
+    if not rows:
+        return
+    async with _write_db() as db:
+        await db.executemany(
+            "INSERT OR REPLACE INTO http_cache (cache_key, etag, last_modified, content_hash, body, updated_at) VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            rows,
+        )
+
+
+@timed(DB_SECONDS)
+async def get_file_id(image_keys: list[str]) -> str | None:
+    """Return a Telegram file_id stored under any of the given image keys."""
+    if not image_keys:
         return None
+    placeholders = ", ".join("?" * len(image_keys))
+    cursor = await _read_db().execute(
+        f"SELECT file_id FROM telegram_files WHERE image_key IN ({placeholders}) LIMIT 1",
+        image_keys,
+    )
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+@timed(DB_SECONDS)
+async def save_file_id(image_keys: list[str], file_id: str):
+    async with _write_db() as db:
+        await db.executemany(
+            "INSERT OR REPLACE INTO telegram_files (image_key, file_id) VALUES (?, ?)",
+            [(key, file_id) for key in image_keys],
+        )
 
 
-async def mark_published(cid: str):
-    async with aiosqlite.connect(DB_PATH) as db:
+@timed(DB_SECONDS)
+async def get_fsm_record(key: str) -> dict | None:
+    cursor = await _read_db().execute(
+        "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (key,)
+    )
+    row = await cursor.fetchone()
+    if row:
+        return dict(row)
+    return None
+
+
+@timed(DB_SECONDS)
+async def save_fsm_record(key: str, state: str | None, data: str, updated_at: float):
+    async with _write_db() as db:
         await db.execute(
-            "UPDATE tournaments SET status = 'published' WHERE cid = ?", (cid,)
+            "INSERT OR REPLACE INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)",
+            (key, state, data, updated_at),
         )
-        await db.commit()
+
+
+@timed(DB_SECONDS)
+async def delete_fsm_record(key: str):
+    async with _write_db() as db:
+        await db.execute("DELETE FROM fsm_storage WHERE key = ?", (key,))
+
+
+@timed(DB_SECONDS)
+async def delete_expired_fsm_records(before: float):
+    async with _write_db() as db:
+        await db.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (before,))
@@ -1,13 +1,29 @@
+import asyncio
+import html
 import logging
+import time
+from datetime import date, timedelta
 
 from aiogram import Bot, Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-
-from config import ADMIN_ID
-from database import get_tournament_by_cid, mark_published
-from poster import load_venues, save_venue, format_post, publish_to_group
+from aiogram.fsm.storage.base import StorageKey
+
+from config import ADMIN_ID, BATCH_LIST_SIZE, DIGEST_PAGE_SIZE, SEARCH_PAGE_SIZE, UPCOMING_DAYS, UPCOMING_MAX_DAYS
+from database import (
+    get_tournament_by_cid, get_linked_tournaments,
+    get_pending_tournaments, get_pending_ids, get_tournaments_by_ids,
+    search_tournaments, get_upcoming_tournaments,
+)
+from poster import NoRoutesError, format_post, publish_to_group
+import metrics
+from models import Tournament
+from sender import outbox
+from storage import fsm_storage
+from venues import load_venues, get_venue, save_venue
 
 logger = logging.getLogger(__name__)
 
@@ -20,32 +36,89 @@ class TournamentPublish(StatesGroup):
     waiting_confirmation = State()
 
 
-async def notify_admin_new_tournament(bot: Bot, tournament: dict):
+class BatchPublish(StatesGroup):
+    selecting = State()
+    waiting_venue = State()
+    waiting_description = State()
+    waiting_confirmation = State()
+
+
+# Strong references to running batch publications
+_batch_tasks: set[asyncio.Task] = set()
+
+
+def venue_keyboard(venues: list[dict], prefix: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=venue["name"], callback_data=f"{prefix}:{venue['id']}")]
+        for venue in venues
+    ])
+
+
+async def notify_admin_new_tournament(bot: Bot, tournament: Tournament):
     """Send notification to admin about a new tournament."""
-    location = tournament.get("location", "")
-    location_line = f"📍 {location}\n" if location else ""
-    source = tournament.get("source", "padelteams")
-    source_label = "tiepadel.com" if source == "tiepadel" else "padelteams.pt"
+    location_line = f"📍 {tournament.location}\n" if tournament.location else ""
+    source_label = "tiepadel.com" if tournament.source == "tiepadel" else "padelteams.pt"
     text = (
         f"🏆 <b>Новый турнир!</b> ({source_label})\n\n"
-        f"<b>{tournament['name']}</b>\n"
-        f"📅 {tournament['dates']}\n"
+        f"<b>{tournament.name}</b>\n"
+        f"📅 {tournament.dates}\n"
         f"{location_line}\n"
-        f"🔗 {tournament['tournament_url']}\n\n"
+        f"🔗 {tournament.tournament_url}\n\n"
         f"Нажмите кнопку, чтобы начать публикацию."
     )
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(
             text="📝 Опубликовать",
-            callback_data=f"publish:{tournament['key']}",
+            callback_data=f"publish:{tournament.cid}",
         )]
     ])
-    await bot.send_message(
+    await outbox.send(ADMIN_ID, lambda: bot.send_message(
         chat_id=ADMIN_ID,
         text=text,
         parse_mode="HTML",
         reply_markup=keyboard,
-    )
+    ))
+
+
+CHANGE_LABELS = {
+    "name": "Название",
+    "dates": "Даты",
+    "location": "Место",
+    "tournament_url": "Ссылка",
+    "image_url": "Обложка",
+}
+
+
+async def notify_admin_tournament_changed(bot: Bot, old: Tournament, new: Tournament, edited_posts: int = 0):
+    """Tell the admin which fields of a known tournament changed on the source."""
+    lines = []
+    for field, label in CHANGE_LABELS.items():
+        before = getattr(old, field) or ""
+        after = getattr(new, field) or ""
+        if before != after:
+            lines.append(f"<b>{label}:</b> {html.escape(before) or '—'} → {html.escape(after) or '—'}")
+
+    text = f"✏️ <b>Турнир изменён:</b> {html.escape(new.name)}\n\n" + "\n".join(lines)
+    if old.status == "published":
+        if edited_posts:
+            text += f"\n\n🔄 Обновлено опубликованных постов: {edited_posts}"
+        else:
+            text += "\n\n⚠️ Турнир уже опубликован, пост в группе не обновлён."
+    keyboard = None
+    if old.status != "published":
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="📝 Опубликовать",
+                callback_data=f"publish:{new.cid}",
+            )]
+        ])
+    await outbox.send(ADMIN_ID, lambda: bot.send_message(
+        chat_id=ADMIN_ID,
+        text=text,
+        parse_mode="HTML",
+        reply_markup=keyboard,
+        disable_web_page_preview=True,
+    ))
 
 
 @router.callback_query(F.data.startswith("publish:"))
@@ -57,6 +130,10 @@ async def on_publish_start(callback: CallbackQuery, state: FSMContext):
 
     key = callback.data.split(":", 1)[1]
     tournament = await get_tournament_by_cid(key)
+    if tournament and tournament.canonical_cid:
+        # Duplicates are published through the tournament they were linked to
+        key = tournament.canonical_cid
+        tournament = await get_tournament_by_cid(key)
     if not tournament:
         await callback.answer("Турнир не найден в базе", show_alert=True)
         return
@@ -69,24 +146,21 @@ async def on_publish_start(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    buttons = []
-    for i, venue in enumerate(venues):
-        buttons.append([InlineKeyboardButton(
-            text=venue["name"],
-            callback_data=f"venue:{i}",
-        )])
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+    links = "".join(
+        f"\n🔗 {t.tournament_url}"
+        for t in [tournament, *await get_linked_tournaments(key)]
+    )
     await callback.message.answer(
-        f"📍 Выберите место проведения для <b>{tournament['name']}</b>:",
+        f"📍 Выберите место проведения для <b>{tournament.name}</b>:{links}",
         parse_mode="HTML",
-        reply_markup=keyboard,
+        reply_markup=venue_keyboard(venues, "venue"),
+        disable_web_page_preview=True,
     )
     await state.set_state(TournamentPublish.waiting_venue)
     await callback.answer()
 
 
-@router.message(TournamentPublish.waiting_venue, F.from_user.id == ADMIN_ID)
+@router.message(TournamentPublish.waiting_venue, F.from_user.id == ADMIN_ID, ~F.text.startswith("/"))
 async def on_venue_text(message: Message, state: FSMContext):
     """Admin typed a custom venue in 'Name | URL' format."""
     text = (message.text or "").strip()
@@ -95,8 +169,7 @@ async def on_venue_text(message: Message, state: FSMContext):
         await message.answer("Формат: <code>Название | ссылка на Google Maps</code>", parse_mode="HTML")
         return
 
-    venue = {"name": parts[0].strip(), "url": parts[1].strip()}
-    save_venue(venue)
+    venue = save_venue({"name": parts[0].strip(), "url": parts[1].strip()})
     await state.update_data(venue=venue)
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -118,14 +191,11 @@ async def on_venue_selected(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Нет доступа", show_alert=True)
         return
 
-    venue_idx = int(callback.data.split(":", 1)[1])
-    venues = load_venues()
-
-    if venue_idx >= len(venues):
+    venue = get_venue(callback.data.split(":", 1)[1])
+    if not venue:
         await callback.answer("Некорректный выбор", show_alert=True)
         return
 
-    venue = venues[venue_idx]
     await state.update_data(venue=venue)
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -172,7 +242,7 @@ async def on_no_description(callback: CallbackQuery, state: FSMContext, bot: Bot
     await callback.answer()
 
 
-@router.message(TournamentPublish.waiting_description, F.from_user.id == ADMIN_ID)
+@router.message(TournamentPublish.waiting_description, F.from_user.id == ADMIN_ID, ~F.text.startswith("/"))
 async def on_description_received(message: Message, state: FSMContext):
     """Admin sent description — show preview and ask for confirmation."""
     description = message.text or ""
@@ -230,12 +300,466 @@ async def on_confirmation(callback: CallbackQuery, state: FSMContext, bot: Bot):
         return
 
     try:
-        await publish_to_group(bot, tournament, venue, description)
-        await mark_published(tournament["cid"])
-        await callback.message.answer("✅ Пост опубликован в группу!")
+        results = await publish_to_group(bot, tournament, venue, description)
+        failed = [r for r in results if r["error"]]
+        if failed:
+            lines = "\n".join(f"• {r['chat_id']}/{r['topic_id']}: {html.escape(r['error'])}" for r in failed)
+            await callback.message.answer(
+                f"⚠️ Опубликовано в {len(results) - len(failed)} из {len(results)} чатов.\n"
+                f"Ошибки:\n{lines}\n\nПовторная публикация отправит пост только туда, где не удалось.",
+                parse_mode="HTML",
+            )
+        else:
+            await callback.message.answer("✅ Пост опубликован в группу!")
+    except NoRoutesError:
+        await callback.message.answer("⚠️ Нет подходящих чатов для этого турнира, проверьте PUBLISH_ROUTES.")
     except Exception as e:
         logger.exception("Failed to publish post")
         await callback.message.answer(f"⚠️ Ошибка публикации: {e}")
 
     await state.clear()
     await callback.answer()
+
+
+
+# --- Digest mode: review pending tournaments and publish them as a batch ---
+
+
+async def build_digest(selected: set[int], page: int) -> tuple[str, InlineKeyboardMarkup]:
+    """Render one page of the pending-tournaments digest."""
+    rows, total = await get_pending_tournaments(DIGEST_PAGE_SIZE, page * DIGEST_PAGE_SIZE)
+    pages = max(1, -(-total // DIGEST_PAGE_SIZE))
+
+    lines = [f"🗂 <b>Ожидают публикации:</b> {total} (выбрано: {len(selected)})", ""]
+    buttons = []
+    for i, t in enumerate(rows, start=page * DIGEST_PAGE_SIZE + 1):
+        source_label = "tiepadel.com" if t.source == "tiepadel" else "padelteams.pt"
+        lines.append(f"{i}. <b>{html.escape(t.name)}</b> — {t.dates} ({source_label})")
+        mark = "☑️" if t.id in selected else "⬜"
+        buttons.append([InlineKeyboardButton(
+            text=f"{mark} {i}. {t.name}"[:64],
+            callback_data=f"dg:t:{t.id}:{page}",
+        )])
+
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton(text="◀️", callback_data=f"dg:p:{page - 1}"))
+    nav.append(InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data=f"dg:p:{page}"))
+    if page + 1 < pages:
+        nav.append(InlineKeyboardButton(text="▶️", callback_data=f"dg:p:{page + 1}"))
+    buttons.append(nav)
+    buttons.append([
+        InlineKeyboardButton(text="☑️ Выбрать все", callback_data=f"dg:all:{page}"),
+        InlineKeyboardButton(text="⬜ Снять все", callback_data=f"dg:none:{page}"),
+    ])
+    buttons.append([InlineKeyboardButton(text=f"➡️ Далее ({len(selected)})", callback_data="dg:next")])
+
+    if not rows:
+        lines.append("Новых турниров нет.")
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def admin_state(bot: Bot) -> FSMContext:
+    """FSM context of the admin's private chat, for use outside a handler."""
+    return FSMContext(storage=fsm_storage, key=StorageKey(bot_id=bot.id, chat_id=ADMIN_ID, user_id=ADMIN_ID))
+
+
+async def _publishing_elsewhere(state: FSMContext) -> bool:
+    """Whether a publish flow other than digest selection is in progress."""
+    return await state.get_state() not in (None, BatchPublish.selecting.state)
+
+
+async def notify_admin_digest(bot: Bot):
+    """Send the admin one digest of all pending tournaments.
+
+    The digest starts with an empty selection, so an earlier one is
+    dropped unless the admin is in the middle of publishing.
+    """
+    state = admin_state(bot)
+    if not await _publishing_elsewhere(state):
+        await state.set_state(BatchPublish.selecting)
+        await state.update_data(batch_selected=[])
+    text, keyboard = await build_digest(set(), 0)
+    await outbox.send(ADMIN_ID, lambda: bot.send_message(
+        chat_id=ADMIN_ID,
+        text=text,
+        parse_mode="HTML",
+        reply_markup=keyboard,
+    ))
+
+
+@router.message(Command("digest"), F.from_user.id == ADMIN_ID)
+async def on_digest_command(message: Message, state: FSMContext):
+    """Admin asked for the pending-tournaments digest."""
+    if await _publishing_elsewhere(state):
+        await message.answer("⚠️ Сначала завершите текущую публикацию.")
+        return
+    await state.set_state(BatchPublish.selecting)
+    await state.update_data(batch_selected=[])
+    text, keyboard = await build_digest(set(), 0)
+    await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
+
+
+@router.callback_query(F.data.startswith("dg:"))
+async def on_digest_action(callback: CallbackQuery, state: FSMContext):
+    """Toggle, page through or confirm the digest selection."""
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("Нет доступа", show_alert=True)
+        return
+
+    if await _publishing_elsewhere(state):
+        await callback.answer("Сначала завершите текущую публикацию", show_alert=True)
+        return
+
+    parts = callback.data.split(":")
+    action = parts[1]
+    data = await state.get_data()
+    selected = set(data.get("batch_selected", []))
+
+    if action == "next":
+        if not selected:
+            await callback.answer("Ничего не выбрано", show_alert=True)
+            return
+        venues = load_venues()
+        if not venues:
+            await callback.message.answer("⚠️ Файл venues.txt пуст. Добавьте площадки.")
+            await callback.answer()
+            return
+        await callback.message.answer(
+            f"📍 Выберите место проведения для выбранных турниров ({len(selected)}):",
+            reply_markup=venue_keyboard(venues, "bvenue"),
+        )
+        await state.set_state(BatchPublish.waiting_venue)
+        await callback.answer()
+        return
+
+    page = int(parts[-1])
+    if action == "t":
+        selected ^= {int(parts[2])}
+    elif action == "all":
+        selected = set(await get_pending_ids())
+    elif action == "none":
+        selected = set()
+
+    await state.set_state(BatchPublish.selecting)
+    await state.update_data(batch_selected=sorted(selected))
+    text, keyboard = await build_digest(selected, page)
+    try:
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
+    except TelegramBadRequest:
+        # Same page re-rendered without changes
+        pass
+    await callback.answer()
+
+
+async def _ask_batch_description(message: Message, state: FSMContext, venue: dict):
+    await state.update_data(venue=venue)
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="Без описания", callback_data="bnodesc")]
+    ])
+    await message.answer(
+        f"✅ Площадка для всех: <b>{venue['name']}</b>\n\n"
+        f"Отправьте общее описание или нажмите кнопку:",
+        parse_mode="HTML",
+        reply_markup=keyboard,
+    )
+    await state.set_state(BatchPublish.waiting_description)
+
+
+@router.callback_query(BatchPublish.waiting_venue, F.data.startswith("bvenue:"))
+async def on_batch_venue_selected(callback: CallbackQuery, state: FSMContext):
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("Нет доступа", show_alert=True)
+        return
+    venue = get_venue(callback.data.split(":", 1)[1])
+    if not venue:
+        await callback.answer("Некорректный выбор", show_alert=True)
+        return
+    await _ask_batch_description(callback.message, state, venue)
+    await callback.answer()
+
+
+@router.message(BatchPublish.waiting_venue, F.from_user.id == ADMIN_ID, ~F.text.startswith("/"))
+async def on_batch_venue_text(message: Message, state: FSMContext):
+    text = (message.text or "").strip()
+    parts = text.split("|", 1)
+    if len(parts) != 2 or not parts[1].strip():
+        await message.answer("Формат: <code>Название | ссылка на Google Maps</code>", parse_mode="HTML")
+        return
+    venue = save_venue({"name": parts[0].strip(), "url": parts[1].strip()})
+    await _ask_batch_description(message, state, venue)
+
+
+async def _ask_batch_confirmation(message: Message, state: FSMContext, description: str):
+    await state.update_data(description=description)
+    data = await state.get_data()
+    tournaments = await get_tournaments_by_ids(data.get("batch_selected", []))
+    if not tournaments:
+        await message.answer("⚠️ Выбранные турниры не найдены в базе.")
+        await state.clear()
+        return
+
+    preview = format_post(tournaments[0], data["venue"], description)
+    await message.answer(f"👁 <b>Превью первого поста:</b>\n\n{preview}", parse_mode="HTML")
+    names = [f"• {html.escape(t.name[:100])}" for t in tournaments[:BATCH_LIST_SIZE]]
+    if len(tournaments) > BATCH_LIST_SIZE:
+        names.append(f"… и ещё {len(tournaments) - BATCH_LIST_SIZE}")
+    await message.answer(
+        f"<b>Будут опубликованы ({len(tournaments)}):</b>\n" + "\n".join(names),
+        parse_mode="HTML",
+    )
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Опубликовать все", callback_data="bconfirm:yes"),
+            InlineKeyboardButton(text="❌ Отмена", callback_data="bconfirm:no"),
+        ]
+    ])
+    await message.answer(f"Опубликовать {len(tournaments)} турниров в группу?", reply_markup=keyboard)
+    await state.set_state(BatchPublish.waiting_confirmation)
+
+
+@router.callback_query(BatchPublish.waiting_description, F.data == "bnodesc")
+async def on_batch_no_description(callback: CallbackQuery, state: FSMContext):
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("Нет доступа", show_alert=True)
+        return
+    await _ask_batch_confirmation(callback.message, state, "")
+    await callback.answer()
+
+
+@router.message(BatchPublish.waiting_description, F.from_user.id == ADMIN_ID, ~F.text.startswith("/"))
+async def on_batch_description(message: Message, state: FSMContext):
+    await _ask_batch_confirmation(message, state, message.text or "")
+
+
+async def _publish_batch(bot: Bot, message: Message, tournaments: list[Tournament], venue: dict, description: str):
+    """Publish the selected tournaments one after another and report the outcome."""
+    published = []
+    failed = []
+    unrouted = []
+    for t in tournaments:
+        try:
+            results = await publish_to_group(bot, t, venue, description)
+        except NoRoutesError:
+            unrouted.append(t.name)
+            continue
+        except Exception:
+            logger.exception(f"Failed to publish {t.name}")
+            failed.append(t.name)
+            continue
+        if any(r["error"] for r in results):
+            failed.append(t.name)
+        else:
+            published.append(t.cid)
+
+    text = f"✅ Опубликовано: {len(published)} из {len(tournaments)}"
+    if failed:
+        text += "\n\n⚠️ Ошибка публикации:\n" + "\n".join(f"• {html.escape(name)}" for name in failed)
+    if unrouted:
+        text += "\n\n⚠️ Нет подходящих чатов:\n" + "\n".join(f"• {html.escape(name)}" for name in unrouted)
+    await message.answer(text, parse_mode="HTML")
+
+
+@router.callback_query(BatchPublish.waiting_confirmation, F.data.startswith("bconfirm:"))
+async def on_batch_confirmation(callback: CallbackQuery, state: FSMContext, bot: Bot):
+    """Admin confirmed or cancelled the batch; publishing runs in the background."""
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("Нет доступа", show_alert=True)
+        return
+
+    if callback.data.split(":", 1)[1] == "no":
+        await callback.message.answer("❌ Публикация отменена.")
+        await state.clear()
+        await callback.answer()
+        return
+
+    data = await state.get_data()
+    tournaments = await get_tournaments_by_ids(data.get("batch_selected", []))
+    await state.clear()
+    tournaments = [t for t in tournaments if t.status == "pending"]
+    if not tournaments:
+        await callback.message.answer("⚠️ Нет турниров для публикации.")
+        await callback.answer()
+        return
+
+    await callback.message.answer(f"⏳ Публикую {len(tournaments)} турниров...")
+    task = asyncio.create_task(
+        _publish_batch(bot, callback.message, tournaments, data["venue"], data.get("description", ""))
+    )
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+    await callback.answer()
+
+
+@router.message(Command("check"), F.from_user.id == ADMIN_ID)
+async def on_check_command(message: Message, run_checks):
+    """Admin asked to check all sources now instead of waiting for the schedule."""
+    await message.answer("🔄 Проверяю источники...")
+    lines = ["<b>Проверка завершена</b>", ""]
+    for summary, joined in await run_checks():
+        name = html.escape(summary["source"])
+        if not summary["ok"]:
+            lines.append(f"⚠️ {name}: источник недоступен")
+            continue
+        line = (
+            f"✅ {name}: новых {summary['new']}, изменённых {summary['changed']}"
+            f" ({summary['seconds']:.1f} с)"
+        )
+        if joined:
+            line += " — проверка уже выполнялась"
+        lines.append(line)
+    await message.answer("\n".join(lines), parse_mode="HTML")
+
+
+
+# --- Lookup commands: /find, /upcoming, /pending ---
+
+STATUS_ICONS = {"pending": "🆕", "published": "✅", "duplicate": "🔗"}
+
+
+async def build_results(search: dict, page: int) -> tuple[str, InlineKeyboardMarkup]:
+    """Render one page of a lookup; search is {"kind": "find"|"upcoming"|"pending", "arg": ...}."""
+    offset = page * SEARCH_PAGE_SIZE
+    kind = search["kind"]
+    if kind == "find":
+        rows, total = await search_tournaments(search["arg"], SEARCH_PAGE_SIZE, offset)
+        title = f"🔎 <b>Поиск «{html.escape(search['arg'])}»:</b> {total}"
+    elif kind == "upcoming":
+        until = (date.today() + timedelta(days=search["arg"])).isoformat()
+        rows, total = await get_upcoming_tournaments(until, SEARCH_PAGE_SIZE, offset)
+        title = f"📅 <b>Ближайшие {search['arg']} дн.:</b> {total}"
+    else:
+        rows, total = await get_pending_tournaments(SEARCH_PAGE_SIZE, offset)
+        title = f"🗂 <b>Ожидают публикации:</b> {total}"
+    pages = max(1, -(-total // SEARCH_PAGE_SIZE))
+
+    lines = [title, ""]
+    buttons = []
+    for i, t in enumerate(rows, start=offset + 1):
+        icon = "🗄" if t.archived else STATUS_ICONS.get(t.status, "")
+        location = f", {html.escape(t.location)}" if t.location else ""
+        lines.append(f"{i}. {icon} <b>{html.escape(t.name)}</b> — {t.dates}{location}")
+        # Archived tournaments are over and no longer in the live table
+        if not t.archived:
+            buttons.append([InlineKeyboardButton(
+                text=f"📝 {i}. {t.name}"[:64],
+                callback_data=f"publish:{t.cid}",
+            )])
+    if not rows:
+        lines.append("Ничего не найдено.")
+
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton(text="◀️", callback_data=f"sr:{page - 1}"))
+    nav.append(InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data=f"sr:{page}"))
+    if page + 1 < pages:
+        nav.append(InlineKeyboardButton(text="▶️", callback_data=f"sr:{page + 1}"))
+    buttons.append(nav)
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+async def _answer_results(message: Message, state: FSMContext, search: dict):
+    # Kept in FSM data so page buttons work without squeezing the query into callback_data
+    await state.update_data(search=search)
+    text, keyboard = await build_results(search, 0)
+    await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
+
+
+@router.message(Command("find"), F.from_user.id == ADMIN_ID)
+async def on_find_command(message: Message, state: FSMContext, command: CommandObject):
+    """Full-text search over tournament names and locations."""
+    if not command.args:
+        await message.answer("Использование: /find <текст>")
+        return
+    await _answer_results(message, state, {"kind": "find", "arg": command.args.strip()})
+
+
+@router.message(Command("upcoming"), F.from_user.id == ADMIN_ID)
+async def on_upcoming_command(message: Message, state: FSMContext, command: CommandObject):
+    """Tournaments starting within the next N days (UPCOMING_DAYS by default)."""
+    days = UPCOMING_DAYS
+    if command.args:
+        arg = command.args.strip()
+        if not arg.isdecimal() or int(arg) > UPCOMING_MAX_DAYS:
+            await message.answer(f"Использование: /upcoming [дней, до {UPCOMING_MAX_DAYS}]")
+            return
+        days = int(arg)
+    await _answer_results(message, state, {"kind": "upcoming", "arg": days})
+
+
+@router.message(Command("pending"), F.from_user.id == ADMIN_ID)
+async def on_pending_command(message: Message, state: FSMContext):
+    """Tournaments not published yet."""
+    await _answer_results(message, state, {"kind": "pending", "arg": None})
+
+
+@router.callback_query(F.data.startswith("sr:"))
+async def on_results_page(callback: CallbackQuery, state: FSMContext):
+    """Page through the last lookup."""
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("Нет доступа", show_alert=True)
+        return
+    search = (await state.get_data()).get("search")
+    if search is None:
+        await callback.answer("Результаты устарели, повторите команду", show_alert=True)
+        return
+    text, keyboard = await build_results(search, int(callback.data.split(":", 1)[1]))
+    try:
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
+    except TelegramBadRequest:
+        # Same page pressed again: message is not modified
+        pass
+    await callback.answer()
+
+
+def _mean_ms(histogram: metrics.Histogram, key: tuple) -> float:
+    series = histogram.values.get(key)
+    return series["sum"] / series["count"] * 1000 if series and series["count"] else 0.0
+
+
+def format_stats() -> str:
+    """Admin summary of the in-process metrics."""
+    uptime = int(time.time() - metrics.START_TIME)
+    lines = [f"📊 <b>Статистика</b> (аптайм {uptime // 3600} ч {uptime % 3600 // 60} мин)", "", "<b>Источники:</b>"]
+    sources = sorted({dict(key)["source"] for key in metrics.CHECKS.values})
+    for name in sources:
+        ok = metrics.CHECKS.get(source=name, result="ok")
+        failed = metrics.CHECKS.get(source=name, result="failed")
+        lines.append(
+            f"• {html.escape(name)}: проверок {ok:g}, ошибок {failed:g}, "
+            f"ср. {_mean_ms(metrics.CHECK_SECONDS, (('source', name),)) / 1000:.1f} с, "
+            f"страниц {metrics.LAST_PAGES.get(source=name):g}, "
+            f"новых {metrics.TOURNAMENTS_FOUND.get(source=name, kind='new'):g}, "
+            f"изменённых {metrics.TOURNAMENTS_FOUND.get(source=name, kind='changed'):g}"
+        )
+    if not sources:
+        lines.append("• проверок ещё не было")
+
+    db_series = sorted(
+        metrics.DB_SECONDS.values.items(), key=lambda item: item[1]["sum"], reverse=True
+    )
+    calls = sum(series["count"] for _, series in db_series)
+    lines += ["", f"<b>База данных:</b> {calls} вызовов"]
+    for key, series in db_series[:5]:
+        op = dict(key)["op"]
+        lines.append(
+            f"• {op}: {series['count']}, ср. {_mean_ms(metrics.DB_SECONDS, key):.1f} мс, "
+            f"p95 ≤ {metrics.DB_SECONDS.quantile(0.95, op=op) * 1000:g} мс"
+        )
+
+    published = metrics.PUBLICATIONS.get(result="published")
+    failed = metrics.PUBLICATIONS.get(result="failed")
+    total = published + failed
+    lines += [
+        "",
+        f"<b>Публикации:</b> успешно {published:g}, ошибок {failed:g}"
+        + (f" ({failed / total:.0%})" if total else "")
+        + f", ср. {_mean_ms(metrics.PUBLISH_SECONDS, ()):.0f} мс",
+    ]
+    return "\n".join(lines)
+
+
+@router.message(Command("stats"), F.from_user.id == ADMIN_ID)
+async def on_stats_command(message: Message):
+    """Admin asked for the bot's metrics summary."""
+    await message.answer(format_stats(), parse_mode="HTML")
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import random
+import time
+
+import aiohttp
+
+from config import BREAKER_FAILURE_THRESHOLD, BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the site is unreachable or unhealthy rather than a bug on our side
+NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with equal jitter: between half and all of base * 2^attempt."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class SourceHealth:
+    """Circuit breaker for one source.
+
+    After BREAKER_FAILURE_THRESHOLD consecutive failed checks the circuit
+    opens and checks are skipped for an exponentially growing, jittered
+    period. When it expires one probe request decides whether full
+    checks resume or the circuit opens again for longer.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= BREAKER_FAILURE_THRESHOLD
+
+    def allow(self) -> str:
+        """'run' for a normal check, 'probe' to test an open circuit, 'skip' otherwise."""
+        if not self.is_open:
+            return "run"
+        if time.monotonic() < self.open_until:
+            return "skip"
+        return "probe"
+
+    def record_success(self):
+        if self.is_open:
+            logger.info(f"{self.name}: source recovered, circuit closed")
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        if isinstance(error, NETWORK_ERRORS):
+            summary = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+            # Only the first failure of a streak is logged at warning level
+            log = logger.warning if self.failures == 1 else logger.debug
+            log(f"{self.name}: fetch failed ({summary})")
+        elif self.failures == 1:
+            logger.error(f"{self.name}: fetch failed", exc_info=error)
+
+        if self.is_open:
+            delay = backoff_delay(
+                self.failures - BREAKER_FAILURE_THRESHOLD, BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS
+            )
+            self.open_until = time.monotonic() + delay
+            logger.warning(
+                f"{self.name}: circuit open after {self.failures} failures, next probe in {delay:.0f}s"
+            )
+
+
+_health: dict[str, SourceHealth] = {}
+
+
+def source_health(name: str) -> SourceHealth:
+    if name not in _health:
+        _health[name] = SourceHealth(name)
+    return _health[name]
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import logging
+from contextvars import ContextVar
+
+import aiohttp
+
+from config import HTTP_TIMEOUT, HTTP_POOL_SIZE, RETRY_BASE_SECONDS
+from database import get_http_cache, save_http_cache
+from health import NETWORK_ERRORS, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+_session: aiohttp.ClientSession | None = None
+
+# Hit/miss counters per stats key (the source name)
+cache_stats: dict[str, dict[str, int]] = {}
+
+
+class RetryBudget:
+    """Number of retries that all requests of one check may spend together."""
+
+    def __init__(self, retries: int):
+        self.remaining = retries
+
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+# Set per check; concurrent requests of that check share it
+retry_budget: ContextVar[RetryBudget | None] = ContextVar("retry_budget", default=None)
+
+# Set per check; cache rows of changed pages wait here until their tournaments are stored
+pending_cache: ContextVar[list[tuple] | None] = ContextVar("pending_cache", default=None)
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, NETWORK_ERRORS)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared pooled HTTP session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        )
+    return _session
+
+
+async def close_session():
+    """Close the shared HTTP session on shutdown."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def fetch_cached(method: str, url: str, data: str | None = None, headers: dict | None = None, stats_key: str = "") -> tuple[str, bool]:
+    """Fetch a page with conditional-GET validators and a content hash.
+
+    Returns the response body and whether it changed since the last fetch.
+    A 304 answer or an identical body hash counts as a cache hit.
+    Network errors, 429 and 5xx answers are retried with backoff while
+    the current check's retry budget lasts. Inside a check the new cache
+    row is only saved by save_pending_cache(), once the page's
+    tournaments are stored, so a failed check fetches the page again.
+    """
+    cache_key = hashlib.sha256(f"{method} {url}\n{data or ''}".encode()).hexdigest()
+    cached = await get_http_cache(cache_key)
+    stats = cache_stats.setdefault(stats_key, {"hits": 0, "misses": 0})
+
+    request_headers = dict(headers or {})
+    if cached and cached["etag"]:
+        request_headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    attempt = 0
+    while True:
+        try:
+            async with get_session().request(method, url, data=data, headers=request_headers) as resp:
+                if resp.status == 304 and cached:
+                    stats["hits"] += 1
+                    return cached["body"], False
+                resp.raise_for_status()
+                body = await resp.text()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+            break
+        except Exception as e:
+            budget = retry_budget.get()
+            if not _is_retryable(e) or budget is None or not budget.take():
+                raise
+            await asyncio.sleep(backoff_delay(attempt, RETRY_BASE_SECONDS, HTTP_TIMEOUT))
+            attempt += 1
+
+    content_hash = hashlib.sha256(body.encode()).hexdigest()
+    if cached and cached["content_hash"] == content_hash:
+        stats["hits"] += 1
+        if (etag, last_modified) != (cached["etag"], cached["last_modified"]):
+            await _save_cache((cache_key, etag, last_modified, content_hash, body))
+        return body, False
+
+    stats["misses"] += 1
+    await _save_cache((cache_key, etag, last_modified, content_hash, body))
+    return body, True
+
+
+async def _save_cache(row: tuple):
+    pending = pending_cache.get()
+    if pending is None:
+        await save_http_cache([row])
+    else:
+        pending.append(row)
+
+
+async def save_pending_cache():
+    """Save the cache rows deferred during the current check."""
+    pending = pending_cache.get()
+    if pending:
+        await save_http_cache(pending)
+        pending.clear()
+
+
+async def probe(method: str, url: str, data: str | None = None, headers: dict | None = None):
+    """Send one uncached request and raise if the site does not answer successfully."""
+    async with get_session().request(method, url, data=data, headers=headers) as resp:
+        resp.raise_for_status()
+
+
+def log_cache_stats(stats_key: str = ""):
+    """Log and reset HTTP cache hit/miss counters for one stats key."""
+    stats = cache_stats.pop(stats_key, None)
+    if stats is None:
+        return
+    logger.info(f"HTTP cache [{stats_key}]: {stats['hits']} unchanged, {stats['misses']} changed")
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+
+from PIL import Image, ImageOps
+
+from config import (
+    IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_PREFETCH_CONCURRENCY,
+    IMAGE_NORMALIZE, IMAGE_MAX_SIDE, IMAGE_FORMAT, IMAGE_QUALITY,
+)
+from http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# Downloads in progress, so concurrent requests for one cover share a fetch
+_in_flight: dict[str, asyncio.Task] = {}
+# Strong references to prefetch tasks until they finish
+_background: set[asyncio.Task] = set()
+
+
+def _cache_path(image_url: str) -> str:
+    # Normalized output is cached per settings, so changing them re-processes covers
+    key = image_url
+    if IMAGE_NORMALIZE:
+        key = f"{image_url}#{IMAGE_FORMAT}:{IMAGE_MAX_SIDE}:{IMAGE_QUALITY}"
+    return os.path.join(IMAGE_CACHE_DIR, hashlib.sha256(key.encode()).hexdigest())
+
+
+def image_extension(image_url: str) -> str:
+    """File extension of the bytes get_image returns for this URL."""
+    if IMAGE_NORMALIZE:
+        return "jpg" if IMAGE_FORMAT == "JPEG" else IMAGE_FORMAT.lower()
+    return image_url.rsplit(".", 1)[-1] if "." in image_url else "jpeg"
+
+
+def normalize_image(data: bytes) -> bytes:
+    """Downscale to IMAGE_MAX_SIDE and re-encode without metadata.
+
+    Returns the original bytes if they cannot be decoded as an image.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # Apply EXIF rotation before the metadata is dropped
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "L"):
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            img.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE), Image.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True)
+            return out.getvalue()
+    except Exception:
+        logger.warning("Failed to normalize image, using original bytes")
+        return data
+
+
+def _read_cached(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # Bump mtime so eviction drops the least recently used files first
+    os.utime(path)
+    return data
+
+
+def _write_cached(path: str, data: bytes):
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    _evict()
+
+
+def _evict():
+    """Remove least recently used files until the cache fits its size limit."""
+    entries = []
+    total = 0
+    with os.scandir(IMAGE_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= IMAGE_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+async def _download(image_url: str, path: str) -> bytes | None:
+    try:
+        async with get_session().get(image_url) as resp:
+            resp.raise_for_status()
+            data = await resp.read()
+    except Exception:
+        logger.warning(f"Failed to download image {image_url}")
+        return None
+    if IMAGE_NORMALIZE:
+        data = await asyncio.to_thread(normalize_image, data)
+    await asyncio.to_thread(_write_cached, path, data)
+    return data
+
+
+async def get_image(image_url: str) -> bytes | None:
+    """Return tournament image bytes from the disk cache, downloading on a miss.
+
+    With IMAGE_NORMALIZE on, the returned and cached bytes are the
+    downscaled, re-encoded cover rather than the original download.
+    """
+    if not image_url:
+        return None
+    path = _cache_path(image_url)
+    data = await asyncio.to_thread(_read_cached, path)
+    if data is not None:
+        return data
+
+    task = _in_flight.get(image_url)
+    if task is None:
+        task = asyncio.create_task(_download(image_url, path))
+        _in_flight[image_url] = task
+        task.add_done_callback(lambda _: _in_flight.pop(image_url, None))
+    return await asyncio.shield(task)
+
+
+async def _prefetch(image_urls: list[str]):
+    semaphore = asyncio.Semaphore(IMAGE_PREFETCH_CONCURRENCY)
+
+    async def fetch_one(image_url: str):
+        async with semaphore:
+            await get_image(image_url)
+
+    await asyncio.gather(*(fetch_one(url) for url in dict.fromkeys(image_urls) if url))
+
+
+def prefetch_images(image_urls: list[str]):
+    """Warm the cache with covers in the background, without waiting for it."""
+    task = asyncio.create_task(_prefetch(image_urls))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from config import MATCH_SIMILARITY
+from models import Tournament
+
+# Words that carry no identity in tournament names on either source
+STOPWORDS = {"de", "do", "da", "dos", "das", "e", "o", "a", "of", "the", "torneio", "tournament", "padel", "fpp"}
+YEAR_RE = re.compile(r"^(19|20)\d\d$")
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> list[str]:
+    """Lowercase, strip accents and punctuation, drop stopwords and years."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    return [
+        word for word in NON_WORD_RE.split(ascii_name)
+        if word and word not in STOPWORDS and not YEAR_RE.match(word)
+    ]
+
+
+def block_key(t: Tournament) -> str | None:
+    """Start date in ISO format; only tournaments sharing it are compared."""
+    return t.start.isoformat() if t.start else None
+
+
+def name_similarity(a: list[str], b: list[str]) -> float:
+    """Best of character-level similarity and word containment of two normalized names."""
+    if not a or not b:
+        return 0.0
+    score = SequenceMatcher(None, " ".join(a), " ".join(b)).ratio()
+    shorter = min(len(set(a)), len(set(b)))
+    if shorter >= 2:
+        score = max(score, len(set(a) & set(b)) / shorter)
+    return score
+
+
+def find_duplicates(new: list[Tournament], candidates: list[dict]) -> dict[str, str]:
+    """Link new tournaments to stored ones from other sources describing the same event.
+
+    candidates are stored rows sharing a block key with some new tournament.
+    Returns new cid -> canonical cid. Each canonical tournament takes at most
+    one duplicate per source, best-scoring pairs first.
+    """
+    blocks: dict[str, list[dict]] = {}
+    taken = set()
+    for row in candidates:
+        if row["canonical_cid"]:
+            taken.add((row["canonical_cid"], row["source"]))
+        else:
+            blocks.setdefault(row["block_key"], []).append(row)
+
+    pairs = []
+    for t in new:
+        key = block_key(t)
+        if key is None:
+            continue
+        source = t.source
+        words = normalize_name(t.name)
+        for row in blocks.get(key, ()):
+            if row["source"] == source:
+                continue
+            score = name_similarity(words, normalize_name(row["name"]))
+            if score >= MATCH_SIMILARITY:
+                pairs.append((score, t.cid, source, row["cid"]))
+
+    links = {}
+    for score, key, source, cid in sorted(pairs, reverse=True):
+        if key in links or (cid, source) in taken:
+            continue
+        links[key] = cid
+        taken.add((cid, source))
+    return links
@@ -0,0 +1,162 @@
+import functools
+import logging
+import math
+import time
+from contextlib import contextmanager
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a single SQLite query up to a full scrape
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+START_TIME = time.time()
+
+
+def _labels_text(labels: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_labels_text(key)} {value:g}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    """Last observed value per label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.values: dict[tuple, dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["buckets"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def quantile(self, q: float, **labels) -> float:
+        """Upper bucket bound below which a q share of observations fall."""
+        series = self.values.get(tuple(sorted(labels.items())))
+        if not series or not series["count"]:
+            return 0.0
+        rank = q * series["count"]
+        for bound, count in zip(self.buckets, series["buckets"]):
+            if count >= rank:
+                return bound
+        return math.inf
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, series in self.values.items():
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series["buckets"] + [series["count"]]):
+                le = _labels_text(key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_labels_text(key)} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{_labels_text(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    """All metrics of the process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics: list[Counter | Histogram] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CHECKS = registry.register(Counter("bot_source_checks_total", "Source checks by result (ok, failed)"))
+CHECK_SECONDS = registry.register(Histogram("bot_source_check_seconds", "Duration of a whole source check"))
+TOURNAMENTS_FOUND = registry.register(Counter("bot_tournaments_found_total", "Tournaments found by kind (new, changed)"))
+FETCH_SECONDS = registry.register(Histogram("bot_fetch_seconds", "Duration of a fetcher run"))
+PAGES = registry.register(Counter("bot_pages_fetched_total", "Pages fetched by whether they changed"))
+LAST_PAGES = registry.register(Gauge("bot_last_fetch_pages", "Pages returned by the last fetch of a source"))
+DB_SECONDS = registry.register(Histogram("bot_db_seconds", "Latency of database.py calls by operation"))
+PUBLISH_SECONDS = registry.register(Histogram("bot_publish_seconds", "Duration of publishing one tournament"))
+PUBLICATIONS = registry.register(Counter("bot_publications_total", "Per-destination publish results (published, failed)"))
+
+
+def timed(histogram: Histogram):
+    """Decorator: observe an async function's latency labelled with its name."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with histogram.time(op=func.__name__):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serve /metrics on host:port; the caller cleans up the returned runner."""
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+MONTHS_RU = {
+    1: "января", 2: "февраля", 3: "марта", 4: "апреля",
+    5: "мая", 6: "июня", 7: "июля", 8: "августа",
+    9: "сентября", 10: "октября", 11: "ноября", 12: "декабря",
+}
+
+# Column order of every tournament query, matching Tournament.from_row
+TOURNAMENT_COLUMNS = (
+    "id, cid, name, dates, image_url, tournament_url, source, location, "
+    "status, canonical_cid, start_date, end_date"
+)
+
+
+def parse_dmy(value: str) -> date | None:
+    """Parse a DD-MM-YYYY string without going through strptime."""
+    parts = value.strip().split("-")
+    if len(parts) != 3 or len(parts[2]) != 4:
+        return None
+    try:
+        return date(int(parts[2]), int(parts[1]), int(parts[0]))
+    except ValueError:
+        return None
+
+
+def parse_dates(dates: str) -> tuple[date | None, date | None]:
+    """Start and end of a display string like '21-03-2026 / 22-03-2026'."""
+    parsed = [parse_dmy(part) for part in (dates or "").split("/")]
+    if None in parsed:
+        return None, None
+    return parsed[0], parsed[-1]
+
+
+def russian_date_label(start: date | None, end: date | None, fallback: str = "") -> str:
+    """'21-22 марта 2026' style label; the fallback is used when dates are unknown."""
+    if start is None or end is None:
+        return fallback.strip()
+    if start == end:
+        return f"{start.day} {MONTHS_RU[start.month]} {start.year}"
+    if start.month == end.month and start.year == end.year:
+        return f"{start.day}-{end.day} {MONTHS_RU[start.month]} {start.year}"
+    if start.year == end.year:
+        return f"{start.day} {MONTHS_RU[start.month]} - {end.day} {MONTHS_RU[end.month]} {end.year}"
+    return f"{start.day} {MONTHS_RU[start.month]} {start.year} - {end.day} {MONTHS_RU[end.month]} {end.year}"
+
+
+@dataclass(frozen=True, slots=True)
+class Tournament:
+    """One tournament, as scraped or as stored.
+
+    `dates` keeps the display string the fingerprint is computed from;
+    `start`/`end` are parsed once when the record is built and `dates_ru`
+    is the label used in posts.
+    """
+    cid: str
+    name: str
+    dates: str
+    image_url: str = ""
+    tournament_url: str = ""
+    source: str = "padelteams"
+    location: str = ""
+    start: date | None = None
+    end: date | None = None
+    # Set for stored tournaments only
+    id: int | None = None
+    status: str = "pending"
+    canonical_cid: str | None = None
+    archived: bool = False
+    dates_ru: str = field(default="", compare=False)
+
+    def __post_init__(self):
+        if not self.dates_ru:
+            object.__setattr__(self, "dates_ru", russian_date_label(self.start, self.end, self.dates))
+
+    @classmethod
+    def from_row(cls, row) -> "Tournament":
+        """Build from a row selected as TOURNAMENT_COLUMNS, optionally followed by an archived flag."""
+        start = row[10]
+        end = row[11]
+        return cls(
+            id=row[0],
+            cid=row[1],
+            name=row[2],
+            dates=row[3],
+            image_url=row[4] or "",
+            tournament_url=row[5] or "",
+            source=row[6] or "padelteams",
+            location=row[7] or "",
+            status=row[8] or "pending",
+            canonical_cid=row[9],
+            start=date.fromisoformat(start) if start else None,
+            end=date.fromisoformat(end) if end else None,
+            archived=bool(row[12]) if len(row) > 12 else False,
+        )
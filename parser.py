@@ -1,16 +1,35 @@
+import asyncio
+import json
 import re
-from datetime import datetime, date
+from collections import deque
+from datetime import date
 
-import requests
-from bs4 import BeautifulSoup
-from config import PARSER_URL, BASE_URL
+from bs4 import BeautifulSoup, SoupStrainer
+from config import BASE_URL, PARSER_BACKEND, TIEPADEL_PAGE_SIZE
+from database import init_db, close_db
+from http_client import fetch_cached, probe, close_session
+from metrics import FETCH_SECONDS, PAGES, LAST_PAGES
+from models import Tournament, parse_dmy, parse_dates
 
+TIEPADEL_URL = "https://www.tiepadel.com/methods.aspx/Get_Find_Tournaments"
+TIEPADEL_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
 
-def fetch_tournaments() -> list[dict]:
-    """Fetch list of tournaments from padelteams.pt organizer page."""
-    response = requests.get(PARSER_URL, timeout=30)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+COMPETITION_KEY_RE = re.compile(r"k=([A-Za-z0-9%=]+)")
+THUMBNAIL_SUFFIX_RE = re.compile(r"_t\.(jpeg|jpg|png|webp)$")
+COMPETITION_HREF_RE = re.compile(r"/info/competition\?k=")
+COMPETITION_LINKS = SoupStrainer("a", href=COMPETITION_HREF_RE)
+
+
+def parse_tournaments_html(html: str) -> list[Tournament]:
+    """Extract future tournaments from a padelteams.pt page with the configured backend."""
+    if PARSER_BACKEND == "fast":
+        return parse_tournaments_html_fast(html)
+    return parse_tournaments_html_soup(html)
+
+
+def parse_tournaments_html_soup(html: str) -> list[Tournament]:
+    """Reference extractor: full html.parser tree queried with CSS selectors."""
+    soup = BeautifulSoup(html, "html.parser")
 
     tournaments = []
     for link_tag in soup.select("a[href*='/info/competition?k=']"):
@@ -49,113 +68,250 @@ def fetch_tournaments() -> list[dict]:
         tournament_url = BASE_URL + href if href.startswith("/") else href
 
         # Filter: only future tournaments (last date >= today)
-        last_date_str = dates.split("/")[-1].strip()
-        try:
-            last_date = datetime.strptime(last_date_str, "%d-%m-%Y").date()
-        except ValueError:
-            last_date = None
-
+        start, end = parse_dates(dates)
+        last_date = end or parse_dmy(dates.split("/")[-1])
         if last_date and last_date < date.today():
             continue
 
-        tournaments.append({
-            "key": key,
-            "name": name,
-            "dates": dates,
-            "image_url": image_url,
-            "tournament_url": tournament_url,
-        })
+        tournaments.append(Tournament(
+            cid=key,
+            name=name,
+            dates=dates,
+            image_url=image_url,
+            tournament_url=tournament_url,
+            start=start,
+            end=end,
+        ))
 
     return tournaments
 
 
-def fetch_tiepadel_tournaments() -> list[dict]:
-    """Fetch FPP tournaments from tiepadel.com (Lisboa region, future only)."""
-    tournaments = []
-    offset = 0
+def parse_tournaments_html_fast(html: str) -> list[Tournament]:
+    """Fast extractor: lxml parse limited to competition anchors, one walk per card."""
+    soup = BeautifulSoup(html, "lxml", parse_only=COMPETITION_LINKS)
     today = date.today()
 
-    while True:
-        resp = requests.post(
-            "https://www.tiepadel.com/methods.aspx/Get_Find_Tournaments",
-            headers={"Content-Type": "application/json; charset=utf-8"},
-            data='{count_items: %d, name:"", filter:1, country:196, state:0, region:11, city:0}' % offset,
-            timeout=30,
-        )
-        resp.raise_for_status()
-        data = resp.json().get("d", [])
-        if not data:
-            break
-
-        for t in data:
-            name = t.get("TITLE", "")
-            promoted = t.get("CRITOU_NAMREC", "")
-            location = t.get("LOC_NAMREC", "")
-
-            # Only FPP tournaments, location != FPP, not Liga
-            if promoted != "Federação Portuguesa de Padel":
-                continue
-            if location == "Federação Portuguesa de Padel":
-                continue
-            if "liga" in name.lower():
-                continue
+    tournaments = []
+    # Same selector as the reference; the strainer also keeps anchors nested in a card
+    for card in soup.find_all("a", href=COMPETITION_HREF_RE):
+        href = card.get("href", "")
+        match = COMPETITION_KEY_RE.search(href)
+        if not match:
+            continue
+
+        name_el = img_el = None
+        date_texts = []
+        for el in card.find_all(True):
+            classes = el.get("class") or ()
+            if el.name == "span":
+                if "px2" in classes and "bold" in classes:
+                    date_texts.append(el.get_text(strip=True))
+            elif el.name == "div":
+                if name_el is None and "text-dark" in classes and "bold" in classes:
+                    name_el = el
+            elif el.name == "img":
+                if img_el is None and "cover-image-mini" in classes:
+                    img_el = el
+
+        dates = " / ".join(date_texts[:2])
+        start, end = parse_dates(dates)
+        last_date = end or parse_dmy(dates.split("/")[-1])
+        if last_date and last_date < today:
+            continue
 
-            # Parse start date (format: "2026-03-13 to 2026-03-15" or "2026-03-13")
-            dates_str = t.get("DATES", "")
-            start_str = dates_str.split(" to ")[0].strip()
+        image_url = ""
+        src = img_el.get("src", "") if img_el else ""
+        if src:
+            full_src = THUMBNAIL_SUFFIX_RE.sub(r".\1", src)
+            image_url = BASE_URL + full_src if full_src.startswith("/") else full_src
+
+        tournaments.append(Tournament(
+            cid=match.group(1),
+            name=name_el.get_text(strip=True) if name_el else "Unknown",
+            dates=dates,
+            image_url=image_url,
+            tournament_url=BASE_URL + href if href.startswith("/") else href,
+            start=start,
+            end=end,
+        ))
+
+    return tournaments
+
+
+def parse_tiepadel_items(items: list[dict], today: date, options: dict | None = None) -> list[Tournament]:
+    """Filter one page of tiepadel.com results down to future tournaments of the promoter.
+
+    By default keeps FPP tournaments whose location is not the FPP itself
+    and whose name does not mention a league ("liga").
+    """
+    options = options or {}
+    promoter = options.get("promoter", "Federação Portuguesa de Padel")
+    excluded_location = options.get("exclude_location", promoter)
+    excluded_words = [w.lower() for w in options.get("exclude_words", ["liga"])]
+
+    tournaments = []
+    for t in items:
+        name = t.get("TITLE", "")
+        promoted = t.get("CRITOU_NAMREC", "")
+        location = t.get("LOC_NAMREC", "")
+
+        if promoter and promoted != promoter:
+            continue
+        if excluded_location and location == excluded_location:
+            continue
+        if any(word in name.lower() for word in excluded_words):
+            continue
+
+        # Dates come as "2026-03-13 to 2026-03-15" or "2026-03-13"; each is parsed once
+        parts = [p.strip() for p in t.get("DATES", "").split(" to ")]
+        parsed = []
+        for p in parts:
             try:
-                start_date = datetime.strptime(start_str, "%Y-%m-%d").date()
+                parsed.append(date.fromisoformat(p))
             except ValueError:
-                start_date = None
+                parsed.append(None)
 
-            if start_date and start_date <= today:
-                continue
+        if parsed[0] and parsed[0] <= today:
+            continue
+
+        # Displayed as DD-MM-YYYY for consistency with padelteams
+        dates = " / ".join(f"{d:%d-%m-%Y}" if d else p for d, p in zip(parsed, parts))
+        start, end = (parsed[0], parsed[-1]) if None not in parsed else (None, None)
 
-            # Convert dates to DD-MM-YYYY format for consistency
-            parts = dates_str.split(" to ")
-            converted_dates = []
-            for p in parts:
-                try:
-                    d = datetime.strptime(p.strip(), "%Y-%m-%d")
-                    converted_dates.append(d.strftime("%d-%m-%Y"))
-                except ValueError:
-                    converted_dates.append(p.strip())
-            dates = " / ".join(converted_dates)
-
-            codtou = str(t.get("CODTOU", ""))
-            link = t.get("LINK", "")
-            tournament_url = f"https://www.tiepadel.com{link}" if link.startswith("/") else link
-            image_url = t.get("IMAGE", "")
-
-            tournaments.append({
-                "key": f"tie_{codtou}",
-                "name": name,
-                "dates": dates,
-                "image_url": image_url,
-                "tournament_url": tournament_url,
-                "source": "tiepadel",
-                "location": location,
-            })
-
-        offset += len(data)
-        if len(data) < 10:
-            break
+        codtou = str(t.get("CODTOU", ""))
+        link = t.get("LINK", "")
+        tournament_url = f"https://www.tiepadel.com{link}" if link.startswith("/") else link
+
+        tournaments.append(Tournament(
+            cid=f"tie_{codtou}",
+            name=name,
+            dates=dates,
+            image_url=t.get("IMAGE", ""),
+            tournament_url=tournament_url,
+            source="tiepadel",
+            location=location,
+            start=start,
+            end=end,
+        ))
 
     return tournaments
 
 
+async def fetch_tournaments(source) -> list[Tournament]:
+    """Fetch list of tournaments from a padelteams.pt organizer page.
+
+    Returns an empty list when the page is unchanged since the last fetch.
+    """
+    with FETCH_SECONDS.time(source=source.name):
+        html, changed = await fetch_cached("GET", source.options["url"], stats_key=source.name)
+        PAGES.inc(source=source.name, changed=str(changed).lower())
+        LAST_PAGES.set(1, source=source.name)
+        if not changed:
+            return []
+        # Parsing a full page is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(parse_tournaments_html, html)
+
+
+async def probe_tournaments(source):
+    """Single uncached request to check that the organizer page is reachable."""
+    await probe("GET", source.options["url"])
+
+
+def _tiepadel_payload(source, offset: int) -> str:
+    options = source.options
+    return '{count_items: %d, name:"", filter:1, country:%d, state:%d, region:%d, city:%d}' % (
+        offset,
+        options.get("country", 196),
+        options.get("state", 0),
+        options.get("region", 0),
+        options.get("city", 0),
+    )
+
+
+async def _fetch_tiepadel_page(source, offset: int) -> tuple[list[dict], bool]:
+    """Fetch one page of tiepadel.com search results starting at offset."""
+    body, changed = await fetch_cached(
+        "POST",
+        TIEPADEL_URL,
+        headers=TIEPADEL_HEADERS,
+        data=_tiepadel_payload(source, offset),
+        stats_key=source.name,
+    )
+    return json.loads(body).get("d", []), changed
+
+
+async def probe_tiepadel(source):
+    """Single uncached request for the first result page."""
+    await probe("POST", TIEPADEL_URL, data=_tiepadel_payload(source, 0), headers=TIEPADEL_HEADERS)
+
+
+async def _fetch_tiepadel_pages(source) -> list[tuple[list[dict], bool]]:
+    """Fetch all result pages, keeping a window of speculative requests in flight.
+
+    Up to source.concurrency pages are requested at once. Pages are
+    consumed in offset order; the first short or empty page ends
+    pagination and any requests already issued past it are cancelled.
+    """
+    pages = []
+    in_flight = deque()
+    next_offset = 0
+    try:
+        while True:
+            while len(in_flight) < source.concurrency:
+                in_flight.append(asyncio.create_task(_fetch_tiepadel_page(source, next_offset)))
+                next_offset += TIEPADEL_PAGE_SIZE
+            data, changed = await in_flight.popleft()
+            if data:
+                pages.append((data, changed))
+            if len(data) < TIEPADEL_PAGE_SIZE:
+                return pages
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def fetch_tiepadel_tournaments(source) -> list[Tournament]:
+    """Fetch future tournaments of one tiepadel.com region.
+
+    Pages unchanged since the last fetch are skipped.
+    """
+    today = date.today()
+    tournaments = []
+    seen = set()
+    with FETCH_SECONDS.time(source=source.name):
+        pages = await _fetch_tiepadel_pages(source)
+    LAST_PAGES.set(len(pages), source=source.name)
+    for data, changed in pages:
+        PAGES.inc(source=source.name, changed=str(changed).lower())
+        if not changed:
+            continue
+        for t in parse_tiepadel_items(data, today, source.options):
+            if t.cid in seen:
+                continue
+            seen.add(t.cid)
+            tournaments.append(t)
+
+    return tournaments
+
+
+async def _main():
+    from sources import load_sources, fetch_source
+
+    await init_db()
+    try:
+        for source in load_sources():
+            print(f"=== {source.name} ({source.type}) ===")
+            for t in await fetch_source(source):
+                print(f"{t.name} | {t.dates} | {t.tournament_url}")
+                if t.location:
+                    print(f"  Location: {t.location}")
+                print(f"  Image: {t.image_url}")
+                print()
+    finally:
+        await close_session()
+        await close_db()
+
+
 if __name__ == "__main__":
-    print("=== padelteams.pt ===")
-    results = fetch_tournaments()
-    for t in results:
-        print(f"{t['name']} | {t['dates']} | {t['tournament_url']}")
-        print(f"  Image: {t['image_url']}")
-        print()
-
-    print("=== tiepadel.com (FPP) ===")
-    results = fetch_tiepadel_tournaments()
-    for t in results:
-        print(f"{t['name']} | {t['dates']} | {t['tournament_url']}")
-        print(f"  Location: {t['location']}")
-        print(f"  Image: {t['image_url']}")
-        print()
+    asyncio.run(_main())
@@ -1,80 +1,34 @@
-import io
-import re
-from datetime import datetime
+import asyncio
+import hashlib
+import logging
 
-import requests
 from aiogram import Bot
-from aiogram.types import BufferedInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, InputMediaPhoto
 
-from config import GROUP_CHAT_ID, TOPIC_ID, VENUES_FILE
+from config import PUBLISH_ROUTES
+from database import (
+    get_file_id, save_file_id, get_delivered_destinations, record_publications, get_published_posts,
+)
+from images import get_image, image_extension
+from metrics import PUBLISH_SECONDS, PUBLICATIONS
+from models import Tournament
+from sender import outbox
 
-MONTHS_RU = {
-    1: "января", 2: "февраля", 3: "марта", 4: "апреля",
-    5: "мая", 6: "июня", 7: "июля", 8: "августа",
-    9: "сентября", 10: "октября", 11: "ноября", 12: "декабря",
-}
+logger = logging.getLogger(__name__)
 
 
-def load_venues() -> list[dict]:
-    """Load venues from venues.txt file."""
-    venues = []
-    with open(VENUES_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split("|", 1)
-            if len(parts) == 2:
-                venues.append({
-                    "name": parts[0].strip(),
-                    "url": parts[1].strip(),
-                })
-    return venues
-
-
-def save_venue(venue: dict):
-    """Append a new venue to venues.txt."""
-    with open(VENUES_FILE, "a", encoding="utf-8") as f:
-        f.write(f"{venue['name']} | {venue['url']}\n")
+class NoRoutesError(Exception):
+    """No PUBLISH_ROUTES rule matches the tournament, so there is nowhere to publish it."""
 
 
-def format_dates_russian(dates_str: str) -> str:
-    """Convert dates like '21-03-2026 / 22-03-2026' to Russian format."""
-    dates_str = dates_str.strip()
-    parts = [d.strip() for d in dates_str.split("/")]
-
-    parsed = []
-    for part in parts:
-        try:
-            parsed.append(datetime.strptime(part, "%d-%m-%Y"))
-        except ValueError:
-            return dates_str
-
-    if len(parsed) == 1:
-        d = parsed[0]
-        return f"{d.day} {MONTHS_RU[d.month]} {d.year}"
-
-    if len(parsed) == 2:
-        d1, d2 = parsed
-        if d1 == d2:
-            return f"{d1.day} {MONTHS_RU[d1.month]} {d1.year}"
-        if d1.month == d2.month and d1.year == d2.year:
-            return f"{d1.day}-{d2.day} {MONTHS_RU[d1.month]} {d1.year}"
-        if d1.year == d2.year:
-            return f"{d1.day} {MONTHS_RU[d1.month]} - {d2.day} {MONTHS_RU[d2.month]} {d2.year}"
-        return f"{d1.day} {MONTHS_RU[d1.month]} {d1.year} - {d2.day} {MONTHS_RU[d2.month]} {d2.year}"
-
-    return dates_str
-
-
-def format_post(tournament: dict, venue: dict, description: str) -> str:
+def format_post(tournament: Tournament, venue: dict, description: str) -> str:
     """Format the post caption in HTML."""
-    name = tournament["name"]
-    url = tournament["tournament_url"]
-    dates_ru = format_dates_russian(tournament["dates"])
+    name = tournament.name
+    url = tournament.tournament_url
+    dates_ru = tournament.dates_ru
 
-    source = tournament.get("source", "padelteams")
-    if source == "tiepadel":
+    if tournament.source == "tiepadel":
         organizer = "Federação Portuguesa de Padel"
         tour_type = "Federation"
     else:
@@ -95,35 +49,172 @@ def format_post(tournament: dict, venue: dict, description: str) -> str:
     return "\n".join(lines)
 
 
-def download_image(image_url: str) -> bytes | None:
-    """Download tournament image."""
+def routes_for(tournament: Tournament) -> list[dict]:
+    """Destinations from PUBLISH_ROUTES whose match rules fit the tournament."""
+    destinations = {}
+    for route in PUBLISH_ROUTES:
+        matched = True
+        for field, expected in route.get("match", {}).items():
+            allowed = expected if isinstance(expected, list) else [expected]
+            if getattr(tournament, field, None) not in allowed:
+                matched = False
+                break
+        if matched:
+            dest = {"chat_id": route["chat_id"], "topic_id": route.get("topic_id") or 0}
+            destinations[(dest["chat_id"], dest["topic_id"])] = dest
+    return list(destinations.values())
+
+
+def _send(bot: Bot, dest: dict, caption: str, photo):
+    """Queue the post for one destination; photo is a file_id, an upload or None."""
+    thread_id = dest["topic_id"] or None
+    if photo is None:
+        return outbox.send(dest["chat_id"], lambda: bot.send_message(
+            chat_id=dest["chat_id"],
+            message_thread_id=thread_id,
+            text=caption,
+            parse_mode="HTML",
+        ))
+    return outbox.send(dest["chat_id"], lambda: bot.send_photo(
+        chat_id=dest["chat_id"],
+        message_thread_id=thread_id,
+        photo=photo,
+        caption=caption,
+        parse_mode="HTML",
+    ))
+
+
+def _result(dest: dict, message=None, error: Exception | None = None) -> dict:
+    if error is not None:
+        logger.error(f"Failed to publish to {dest['chat_id']}/{dest['topic_id']}: {error}")
+    return {
+        **dest,
+        "message_id": message.message_id if message else None,
+        "kind": ("photo" if message.photo else "text") if message else None,
+        "error": str(error) if error is not None else None,
+    }
+
+
+async def _send_result(bot: Bot, dest: dict, caption: str, photo) -> dict:
     try:
-        resp = requests.get(image_url, timeout=30)
-        resp.raise_for_status()
-        return resp.content
-    except Exception:
-        return None
+        return _result(dest, await _send(bot, dest, caption, photo))
+    except Exception as e:
+        return _result(dest, error=e)
+
+
+async def publish_to_group(bot: Bot, tournament: Tournament, venue: dict, description: str) -> list[dict]:
+    """Publish the post to every destination routed for this tournament.
+
+    Destinations that already have the post are skipped, so publishing
+    again only retries failed ones. The cover is uploaded at most once:
+    a known Telegram file_id (looked up by image URL, then by a hash of
+    the image bytes) or the file_id of the first upload is reused for
+    all other destinations, which are sent to concurrently.
+    Returns one result dict per attempted destination, an empty list when
+    every destination already has the post. Raises NoRoutesError when no
+    route matches the tournament.
+    """
+    with PUBLISH_SECONDS.time():
+        results = await _publish(bot, tournament, venue, description)
+    for r in results:
+        PUBLICATIONS.inc(result="failed" if r["error"] else "published")
+    return results
+
+
+async def _publish(bot: Bot, tournament: Tournament, venue: dict, description: str) -> list[dict]:
+    caption = format_post(tournament, venue, description)
+    image_url = tournament.image_url
+    destinations = routes_for(tournament)
+    if not destinations:
+        raise NoRoutesError(f"No publish route matches {tournament.cid}")
+    delivered = await get_delivered_destinations(tournament.cid)
+    remaining = [d for d in destinations if (d["chat_id"], d["topic_id"]) not in delivered]
+    if not remaining:
+        # Already delivered everywhere
+        return []
+
+    image_keys = [f"url:{image_url}"] if image_url else []
+    file_id = await get_file_id(image_keys)
+    image_data = None
+    if file_id is None and image_url:
+        image_data = await get_image(image_url)
+        if image_data:
+            image_keys.append(f"sha256:{hashlib.sha256(image_data).hexdigest()}")
+            file_id = await get_file_id(image_keys[1:])
+
+    results = []
+    if file_id:
+        dest = remaining.pop(0)
+        try:
+            results.append(_result(dest, await _send(bot, dest, caption, file_id)))
+            if image_data is not None:
+                # Found by content hash: remember it under this URL as well
+                await save_file_id(image_keys, file_id)
+        except TelegramBadRequest:
+            logger.warning(f"Cached file_id for {image_url} rejected, uploading again")
+            file_id = None
+            remaining.insert(0, dest)
+            if image_data is None:
+                image_data = await get_image(image_url)
+        except Exception as e:
+            results.append(_result(dest, error=e))
+
+    if file_id is None and image_data:
+        if len(image_keys) < 2:
+            image_keys.append(f"sha256:{hashlib.sha256(image_data).hexdigest()}")
+        # Upload to the first destination that accepts it, then reuse its file_id
+        while remaining and file_id is None:
+            dest = remaining.pop(0)
+            upload = BufferedInputFile(image_data, filename=f"tournament.{image_extension(image_url)}")
+            try:
+                message = await _send(bot, dest, caption, upload)
+            except Exception as e:
+                results.append(_result(dest, error=e))
+                continue
+            file_id = message.photo[-1].file_id
+            await save_file_id(image_keys, file_id)
+            results.append(_result(dest, message))
 
+    results.extend(await asyncio.gather(*(_send_result(bot, d, caption, file_id) for d in remaining)))
+    await record_publications(tournament.cid, results, venue, description)
+    return results
 
-async def publish_to_group(bot: Bot, tournament: dict, venue: dict, description: str):
-    """Publish formatted post with photo to Telegram group topic."""
-    caption = format_post(tournament, venue, description)
-    image_data = download_image(tournament["image_url"])
-
-    if image_data:
-        ext = tournament["image_url"].rsplit(".", 1)[-1] if "." in tournament["image_url"] else "jpeg"
-        photo = BufferedInputFile(image_data, filename=f"tournament.{ext}")
-        await bot.send_photo(
-            chat_id=GROUP_CHAT_ID,
-            message_thread_id=TOPIC_ID if TOPIC_ID else None,
-            photo=photo,
-            caption=caption,
-            parse_mode="HTML",
-        )
-    else:
-        await bot.send_message(
-            chat_id=GROUP_CHAT_ID,
-            message_thread_id=TOPIC_ID if TOPIC_ID else None,
-            text=caption,
-            parse_mode="HTML",
-        )
+
+async def _edit_post(bot: Bot, tournament: Tournament, post: dict, image_changed: bool) -> bool:
+    venue = {"name": post["venue_name"], "url": post["venue_url"]}
+    caption = format_post(tournament, venue, post["description"] or "")
+    chat_id = post["chat_id"]
+    message_id = post["message_id"]
+    try:
+        if post["kind"] == "photo" and image_changed:
+            image_data = await get_image(tournament.image_url)
+            if image_data:
+                media = InputMediaPhoto(
+                    media=BufferedInputFile(image_data, filename=f"tournament.{image_extension(tournament.image_url)}"),
+                    caption=caption,
+                    parse_mode="HTML",
+                )
+                await outbox.send(chat_id, lambda: bot.edit_message_media(
+                    chat_id=chat_id, message_id=message_id, media=media,
+                ))
+                return True
+        if post["kind"] == "photo":
+            await outbox.send(chat_id, lambda: bot.edit_message_caption(
+                chat_id=chat_id, message_id=message_id, caption=caption, parse_mode="HTML",
+            ))
+        else:
+            await outbox.send(chat_id, lambda: bot.edit_message_text(
+                chat_id=chat_id, message_id=message_id, text=caption, parse_mode="HTML",
+            ))
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to edit post {chat_id}/{message_id} of {tournament.cid}: {e}")
+        return False
+
+
+async def update_published_posts(bot: Bot, tournament: Tournament, image_changed: bool) -> int:
+    """Edit the already published posts of a changed tournament; returns how many were edited."""
+    # Posts published before venues were recorded cannot be re-rendered
+    posts = [p for p in await get_published_posts(tournament.cid) if p["venue_name"]]
+    results = await asyncio.gather(*(_edit_post(bot, tournament, p, image_changed) for p in posts))
+    return sum(results)
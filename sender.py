@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+from config import SEND_RATE_PRIVATE, SEND_RATE_GROUP, SEND_RATE_GLOBAL, SEND_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SendQueue:
+    """Outbound Telegram calls, queued per chat and rate limited.
+
+    Each chat has its own FIFO worker and token bucket, so different chats
+    are served concurrently while one chat never exceeds its limit. A
+    global bucket caps the bot as a whole. RetryAfter is honoured and
+    network/server errors are retried up to SEND_MAX_RETRIES times.
+    """
+
+    def __init__(self):
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._global = TokenBucket(SEND_RATE_GLOBAL, SEND_RATE_GLOBAL)
+
+    async def send(self, chat_id: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Queue a Telegram API call for chat_id and wait for its result."""
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+            # Private chats have positive ids, groups and channels negative
+            rate = SEND_RATE_PRIVATE if chat_id > 0 else SEND_RATE_GROUP
+            self._workers[chat_id] = asyncio.create_task(self._worker(queue, TokenBucket(rate)))
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((call, future))
+        return await future
+
+    async def _worker(self, queue: asyncio.Queue, bucket: TokenBucket):
+        while True:
+            call, future = await queue.get()
+            if future.cancelled():
+                continue
+            try:
+                result = await self._deliver(call, bucket)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def _deliver(self, call: Callable[[], Awaitable[Any]], bucket: TokenBucket) -> Any:
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                return await call()
+            except TelegramRetryAfter as e:
+                if attempt >= SEND_MAX_RETRIES:
+                    raise
+                logger.warning(f"Flood control, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt >= SEND_MAX_RETRIES:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(f"Telegram send failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        """Stop the workers; calls still queued are cancelled."""
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                future.cancel()
+        self._workers.clear()
+        self._queues.clear()
+
+
+outbox = SendQueue()
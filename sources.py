@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from config import SOURCES, CHECK_INTERVAL_MINUTES, RETRY_BUDGET
+from health import source_health
+from http_client import RetryBudget, retry_budget
+from models import Tournament
+from parser import fetch_tournaments, fetch_tiepadel_tournaments, probe_tournaments, probe_tiepadel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Source:
+    """One configured scrape target, checked by its own scheduler job."""
+    name: str
+    type: str
+    interval_minutes: int = CHECK_INTERVAL_MINUTES
+    timeout: float = 120
+    concurrency: int = 1
+    # Type-specific settings: URL, region, filters...
+    options: dict = field(default_factory=dict)
+
+
+# Source type -> fetcher. A new kind of site needs a fetcher here;
+# a new region or organizer of a known kind only needs a SOURCES entry.
+SOURCE_TYPES: dict[str, Callable[[Source], Awaitable[list[Tournament]]]] = {
+    "padelteams": fetch_tournaments,
+    "tiepadel": fetch_tiepadel_tournaments,
+}
+
+# Source type -> single-request health probe used while the circuit is open
+SOURCE_PROBES: dict[str, Callable[[Source], Awaitable[None]]] = {
+    "padelteams": probe_tournaments,
+    "tiepadel": probe_tiepadel,
+}
+
+COMMON_FIELDS = ("name", "type", "interval_minutes", "timeout", "concurrency")
+
+
+def load_sources(configs: list[dict] = SOURCES) -> list[Source]:
+    """Build Source objects from config entries, rejecting unknown types."""
+    sources = []
+    for cfg in configs:
+        if cfg.get("type") not in SOURCE_TYPES:
+            raise ValueError(f"Unknown source type {cfg.get('type')!r} for source {cfg.get('name')!r}")
+        sources.append(Source(
+            **{k: cfg[k] for k in COMMON_FIELDS if k in cfg},
+            options={k: v for k, v in cfg.items() if k not in COMMON_FIELDS},
+        ))
+    return sources
+
+
+async def fetch_source(source: Source) -> list[Tournament]:
+    """Run the source's fetcher, giving up after its timeout."""
+    return await asyncio.wait_for(SOURCE_TYPES[source.type](source), source.timeout)
+
+
+async def run_source(source: Source) -> list[Tournament] | None:
+    """Fetch a source through its circuit breaker.
+
+    Returns None when the check was skipped or failed; failures are
+    logged tersely by the breaker instead of a traceback per run.
+    """
+    health = source_health(source.name)
+    decision = health.allow()
+    if decision == "skip":
+        logger.debug(f"{source.name}: circuit open, skipping check")
+        return None
+    if decision == "probe":
+        try:
+            await asyncio.wait_for(SOURCE_PROBES[source.type](source), source.timeout)
+        except Exception as e:
+            health.record_failure(e)
+            return None
+        logger.info(f"{source.name}: probe succeeded, resuming checks")
+
+    token = retry_budget.set(RetryBudget(RETRY_BUDGET))
+    try:
+        tournaments = await fetch_source(source)
+    except Exception as e:
+        health.record_failure(e)
+        return None
+    finally:
+        retry_budget.reset(token)
+    health.record_success()
+    return tournaments
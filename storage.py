@@ -0,0 +1,80 @@
+import json
+import time
+from dataclasses import astuple
+from typing import Any, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from config import FSM_STATE_TTL
+from database import get_fsm_record, save_fsm_record, delete_fsm_record, delete_expired_fsm_records
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage persisted in tournaments.db with a write-through memory cache.
+
+    Reads are served from memory after the first access to a key; every
+    change is written to SQLite so a restart resumes the conversation.
+    Sessions untouched for longer than the TTL are dropped.
+    """
+
+    def __init__(self, ttl: int = FSM_STATE_TTL):
+        self.ttl = ttl
+        # key -> (state, data, updated_at)
+        self._cache: dict[str, tuple[str | None, dict[str, Any], float]] = {}
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(str(part) for part in astuple(key))
+
+    async def _load(self, key: StorageKey) -> tuple[str | None, dict[str, Any]]:
+        k = self._key(key)
+        entry = self._cache.get(k)
+        if entry is None:
+            row = await get_fsm_record(k)
+            entry = (row["state"], json.loads(row["data"]), row["updated_at"]) if row else (None, {}, time.time())
+            self._cache[k] = entry
+        state, data, updated_at = entry
+        if time.time() - updated_at > self.ttl:
+            self._cache.pop(k, None)
+            await delete_fsm_record(k)
+            return None, {}
+        return state, data
+
+    async def _store(self, key: StorageKey, state: str | None, data: dict[str, Any]):
+        k = self._key(key)
+        now = time.time()
+        if state is None and not data:
+            self._cache[k] = (None, {}, now)
+            await delete_fsm_record(k)
+            return
+        self._cache[k] = (state, data, now)
+        await save_fsm_record(k, state, json.dumps(data, ensure_ascii=False), now)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _, data = await self._load(key)
+        await self._store(key, state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state, _ = await self._load(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        state, _ = await self._load(key)
+        await self._store(key, state, dict(data))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data = await self._load(key)
+        return data.copy()
+
+    async def purge_expired(self):
+        """Delete persisted sessions older than the TTL."""
+        await delete_expired_fsm_records(time.time() - self.ttl)
+
+    async def close(self) -> None:
+        # The shared database connection is closed by close_db()
+        self._cache.clear()
+
+
+# Shared by the dispatcher and by admin notifications sent outside a handler
+fsm_storage = SQLiteStorage()
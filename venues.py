@@ -0,0 +1,95 @@
+import hashlib
+import os
+
+from config import VENUES_FILE
+
+
+def venue_id(name: str) -> str:
+    """Stable short ID for callback data, derived from the venue name."""
+    return hashlib.sha1(name.casefold().encode()).hexdigest()[:10]
+
+
+class VenueRegistry:
+    """Venues from venues.txt, kept in memory and reloaded when the file changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = None
+        self._venues: dict[str, dict] = {}
+        self._urls: set[str] = set()
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+
+        self._venues = {}
+        self._urls = set()
+        if stamp is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    parts = line.split("|", 1)
+                    if len(parts) == 2:
+                        self._remember(parts[0].strip(), parts[1].strip())
+        self._stamp = stamp
+
+    def _remember(self, name: str, url: str) -> dict | None:
+        vid = venue_id(name)
+        if vid in self._venues or url in self._urls:
+            return None
+        venue = {"id": vid, "name": name, "url": url}
+        self._venues[vid] = venue
+        self._urls.add(url)
+        return venue
+
+    def all(self) -> list[dict]:
+        self._refresh()
+        return list(self._venues.values())
+
+    def get(self, vid: str) -> dict | None:
+        self._refresh()
+        return self._venues.get(vid)
+
+    def find(self, name: str, url: str) -> dict | None:
+        """Return a stored venue with the same name or URL."""
+        self._refresh()
+        venue = self._venues.get(venue_id(name))
+        if venue:
+            return venue
+        return next((v for v in self._venues.values() if v["url"] == url), None)
+
+    def add(self, name: str, url: str) -> dict:
+        """Append a venue to the file unless one with this name or URL exists."""
+        existing = self.find(name, url)
+        if existing:
+            return existing
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{name} | {url}\n")
+        venue = self._remember(name, url)
+        st = os.stat(self.path)
+        self._stamp = (st.st_mtime_ns, st.st_size)
+        return venue
+
+
+registry = VenueRegistry(VENUES_FILE)
+
+
+def load_venues() -> list[dict]:
+    """Return all venues from venues.txt."""
+    return registry.all()
+
+
+def get_venue(vid: str) -> dict | None:
+    return registry.get(vid)
+
+
+def save_venue(venue: dict) -> dict:
+    """Add a venue to venues.txt and return the stored entry."""
+    return registry.add(venue["name"], venue["url"])